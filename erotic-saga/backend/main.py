@@ -1,15 +1,35 @@
 from fastapi import FastAPI, UploadFile, Form, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, FileResponse
+from fastapi.concurrency import run_in_threadpool
 from utils.ai_api import call_ai_edit_image, generate_questions
-from utils.file_manager import save_image_file, encode_image_base64, image_to_base64_to_front_end, load_characters, save_characters, UPLOAD_DIR
-from utils.question_loader import load_questions_for_character
+from utils.file_manager import save_image_file, encode_image_base64, image_to_base64_to_front_end, character_image_paths, load_characters, save_characters, catalog_stamp, catalog_lock, UPLOAD_DIR
+from utils.blob_store import put_bytes, image_for_front_end, blob_path_for_name, release_blobs, collect_garbage
+from utils.question_store import ensure_questions, get_question as get_stored_question, save_questions, delete_questions, delete_questions_many
+from utils.search_index import character_index
+from utils.question_bank import question_bank
+from utils.trash import move_to_trash, sweep_orphaned_folders, start_reaper
+from utils.analytics import gameplay_stats
+from utils.rate_limit import generation_limiter, client_key
+from utils.warmup import start_warmup, warmup_status
+from utils.logger import setup_logging, get_logger, request_id_var
+from utils.game_sessions import save_progress, get_progress, clear_progress, clear_character_progress, MAX_HEARTS
+from utils.static_frontend import frontend_available, serve_frontend_file
+from utils.profiling import PROFILING_ENABLED, StackSampler, should_profile, start_timings, finish_timings
 from typing import List
-import base64
 import os
 import requests
 import asyncio
+import contextvars
+import functools
+import threading
+import time
+import uuid
 
 
+setup_logging()
+logger = get_logger("main")
+
 app = FastAPI(title="AI Millionaire Game")
 
 app.add_middleware(
@@ -20,6 +40,118 @@ app.add_middleware(
 )
 
 
+async def profiling_middleware(request: Request, call_next):
+    """
+    Registered only when PROFILING_ENABLED is set:
+    - add a Server-Timing header (catalog, questions, listing, image) to every response
+    - profile the request with a sampling profiler when the x-profile header holds the admin
+      password, or at random with probability PROFILE_SAMPLE_RATE
+    """
+    profile_password = request.headers.get("x-profile")
+    sampler = None
+    if should_profile(bool(profile_password) and verify_admin_password(profile_password)):
+        sampler = StackSampler(threading.get_ident())
+        sampler.start()
+
+    timings_token = start_timings()
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        server_timing = finish_timings(timings_token)
+        if sampler:
+            sampler.stop()
+
+    total = f"total;dur={(time.perf_counter() - start) * 1000:.2f}"
+    response.headers["Server-Timing"] = f"{server_timing}, {total}" if server_timing else total
+    if sampler:
+        profile_path = sampler.write(f"{request.method}_{request.url.path}_{request_id_var.get() or ''}")
+        response.headers["x-profile-file"] = os.path.basename(profile_path)
+        logger.info("Request profiled", extra={"profile": profile_path, "path": request.url.path})
+    return response
+
+
+# Registered before request_id_middleware so it runs inside it (request id already set);
+# not registered at all when profiling is disabled, so requests skip the extra middleware layer
+if PROFILING_ENABLED:
+    app.middleware("http")(profiling_middleware)
+
+
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    """
+    Tag every log line of a request with its id (x-request-id header, or a new one)
+    """
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex[:16]
+    token = request_id_var.set(request_id)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["x-request-id"] = request_id
+    logger.debug(
+        "Request handled",
+        extra={
+            "request_id": request_id,
+            "method": request.method,
+            "path": request.url.path,
+            "status": response.status_code,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+        },
+    )
+    return response
+
+
+# ==================== STARTUP ====================
+@app.on_event("startup")
+def start_background_workers():
+    """
+    Move orphaned character folders and unreferenced images to the trash,
+    start background workers and warm the caches
+    """
+    try:
+        characters = load_characters()
+    except (OSError, ValueError) as e:
+        # Never clean up against a catalog that couldn't be read: everything would look orphaned
+        logger.error("Could not read the catalog, skipping the startup cleanup: %s", e)
+        characters = []
+    moved = sweep_orphaned_folders(characters)
+    if moved:
+        logger.info("Startup sweep: %d orphaned folders moved to trash", moved)
+    collect_garbage(characters)
+    start_reaper()
+    gameplay_stats.start_flusher()
+    start_warmup()
+
+
+@app.on_event("shutdown")
+def flush_pending_data():
+    """
+    Write buffered gameplay analytics before the worker exits
+    """
+    gameplay_stats.flush()
+
+
+# ==================== HEALTH CHECKS ====================
+@app.get("/healthz")
+async def healthz():
+    """
+    Liveness: the process is up and serving requests
+    """
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    """
+    Readiness: 200 once the startup warm-up has finished, 503 before
+    """
+    if not warmup_status["ready"]:
+        return JSONResponse(status_code=503, content={"ready": False, **warmup_status})
+    return warmup_status
+
+
 # ==================== ADMIN PASSWORD AUTHENTICATION API ====================
 def verify_admin_password(password: str) -> bool:
     """
@@ -61,7 +193,7 @@ async def get_prompts():
     except FileNotFoundError:
         return {"prompts": []}
     except Exception as e:
-        print(f"❌ Error reading suggested_prompts.json: {e}")
+        logger.error("Error reading suggested_prompts.json: %s", e)
         return {"prompts": []}
 
 
@@ -69,8 +201,9 @@ async def get_prompts():
 # 🔹 API 1: Get all characters
 # ===============================================
 
+# Plain function so it runs in the threadpool: loads the catalog and encodes images
 @app.get("/api/characters")
-async def get_characters(request: Request, offset: int = 0, platform: str = "desktop"):
+def get_characters(request: Request, offset: int = 0, platform: str = "desktop"):
     """
     Return a list of characters filtered by status and owner
     - status == "public" OR (owner == user_id)
@@ -112,7 +245,7 @@ async def get_characters(request: Request, offset: int = 0, platform: str = "des
     for char in filtered_characters:
         img_path = char.get("original_image")
         if img_path:
-            char["image"] = image_to_base64_to_front_end(img_path)
+            char["image"], char["image_url"] = image_for_front_end(img_path)
 
     return {
         "characters": filtered_characters,
@@ -123,16 +256,57 @@ async def get_characters(request: Request, offset: int = 0, platform: str = "des
     }
 
 
+# ===============================================
+# 🔹 API: Search characters by name
+# ===============================================
+# Plain function (threadpool): refreshing the index loads the catalog and checks the shared cache
+@app.get("/api/characters/search")
+def search_characters(request: Request, q: str = "", offset: int = 0, platform: str = "desktop"):
+    """
+    Search characters by name (prefix / substring match on normalized names)
+    - Same visibility rules as /api/characters: status == "public" OR owner == user_id
+    - Supports pagination with offset parameter (desktop: 10, mobile: 8)
+    """
+    user_id = request.headers.get("x-user-id", None)
+
+    if platform.lower() == "mobile":
+        limit = 8
+    else:
+        limit = 10
+
+    # Re-indexes whatever changed since the last search, on this worker or any other
+    character_index.refresh(load_characters, catalog_stamp())
+    total, page_ids = character_index.search(q, user_id=user_id, offset=offset, limit=limit)
+    # The index keeps the characters, so only the page is copied (not the whole catalog)
+    characters = character_index.get_characters(page_ids)
+
+    for char in characters:
+        img_path = char.get("original_image")
+        if img_path:
+            char["image"], char["image_url"] = image_for_front_end(img_path)
+
+    return {
+        "characters": characters,
+        "total": total,
+        "limit": len(characters),
+        "offset": offset,
+        "platform": platform,
+        "q": q
+    }
+
+
 # ===============================================
 # 🔹 API: Admin - Get all characters (no filtering)
 # ===============================================
+# Admin catalog handlers are plain functions too: they load/save the catalog (disk + shared cache)
+# and wait on catalog_lock, which must not block the event loop
 @app.get("/api/admin/characters")
-async def get_all_characters_admin(request: Request, offset: int = 0, platform: str = "desktop", sort: str = "oldest"):
+def get_all_characters_admin(request: Request, offset: int = 0, platform: str = "desktop", sort: str = "oldest"):
     """
     Return all characters without filtering (admin only)
     Requires admin password in x-admin-password header
     Supports pagination with offset parameter
-    Supports sorting with sort parameter: "oldest", "newest", "name_asc", "name_desc"
+    Supports sorting with sort parameter: "oldest", "newest", "name_asc", "name_desc", "popular"
     - Backend automatically determines limit based on platform (desktop: 10, mobile: 8)
     """
     password = request.headers.get("x-admin-password", None)
@@ -160,6 +334,10 @@ async def get_all_characters_admin(request: Request, offset: int = 0, platform:
     elif sort == "name_desc":
         # Sort by name Z-A
         characters = sorted(characters, key=lambda x: x.get("name", "").lower(), reverse=True)
+    elif sort == "popular":
+        # Sort by play count, most played first
+        plays = gameplay_stats.plays_by_character()
+        characters = sorted(characters, key=lambda x: plays.get(x["id"], 0), reverse=True)
     # If sort is invalid, default to oldest (no change)
     
     # Apply pagination after sorting
@@ -177,7 +355,7 @@ async def get_all_characters_admin(request: Request, offset: int = 0, platform:
     for char in characters:
         img_path = char.get("original_image")
         if img_path:
-            char["image"] = image_to_base64_to_front_end(img_path)
+            char["image"], char["image_url"] = image_for_front_end(img_path)
 
     return {
         "characters": characters,
@@ -189,11 +367,50 @@ async def get_all_characters_admin(request: Request, offset: int = 0, platform:
     }
 
 
+# ===============================================
+# 🔹 API: Admin - Search all characters (no filtering)
+# ===============================================
+@app.get("/api/admin/characters/search")
+def search_characters_admin(request: Request, q: str = "", offset: int = 0, platform: str = "desktop"):
+    """
+    Search all characters by name regardless of status/owner (admin only)
+    Requires admin password in x-admin-password header
+    """
+    password = request.headers.get("x-admin-password", None)
+    if not password or not verify_admin_password(password):
+        raise HTTPException(status_code=401, detail="Unauthorized: Invalid admin password")
+
+    if platform.lower() == "mobile":
+        limit = 8
+    else:
+        limit = 10
+
+    # Re-indexes whatever changed since the last search, on this worker or any other
+    character_index.refresh(load_characters, catalog_stamp())
+    total, page_ids = character_index.search(q, admin=True, offset=offset, limit=limit)
+    # The index keeps the characters, so only the page is copied (not the whole catalog)
+    characters = character_index.get_characters(page_ids)
+
+    for char in characters:
+        img_path = char.get("original_image")
+        if img_path:
+            char["image"], char["image_url"] = image_for_front_end(img_path)
+
+    return {
+        "characters": characters,
+        "total": total,
+        "limit": len(characters),
+        "offset": offset,
+        "platform": platform,
+        "q": q
+    }
+
+
 # ===============================================
 # 🔹 API: Admin - Delete character
 # ===============================================
 @app.delete("/api/admin/characters/{character_id}")
-async def delete_character(character_id: int, request: Request):
+def delete_character(character_id: int, request: Request):
     """
     Delete a character and its folder (admin only)
     Requires admin password in x-admin-password header
@@ -202,26 +419,30 @@ async def delete_character(character_id: int, request: Request):
     if not password or not verify_admin_password(password):
         raise HTTPException(status_code=401, detail="Unauthorized: Invalid admin password")
     
-    import shutil
-    
-    characters = load_characters()
-    char = next((c for c in characters if c["id"] == character_id), None)
-    
-    if not char:
-        raise HTTPException(status_code=404, detail="Character not found")
-    
-    # Delete the character folder
-    folder_path = char.get("folder")
-    if folder_path and os.path.exists(folder_path):
+    with catalog_lock:
+        characters = load_characters()
+        char = next((c for c in characters if c["id"] == character_id), None)
+
+        if not char:
+            raise HTTPException(status_code=404, detail="Character not found")
+
+        # Remove from characters list
+        characters = [c for c in characters if c["id"] != character_id]
+        save_characters(characters)
+
+        # Move the folder and no longer referenced images to the trash; the background reaper deletes them later.
+        # Still under the lock: an upload could otherwise start referencing one of these images meanwhile
+        release_blobs(character_image_paths(char) + [char.get("original_image")], characters)
+        folder_path = char.get("folder")
         try:
-            shutil.rmtree(folder_path)
-            print(f"✅ Deleted folder: {folder_path}")
+            if move_to_trash(folder_path):
+                logger.info("Moved folder to trash", extra={"folder": folder_path})
         except Exception as e:
-            print(f"⚠️ Error deleting folder {folder_path}: {e}")
-    
-    # Remove from characters list
-    characters = [c for c in characters if c["id"] != character_id]
-    save_characters(characters)
+            logger.warning("Error moving folder %s to trash: %s", folder_path, e)
+    delete_questions(character_id)
+    question_bank.remove_source(f"character:{character_id}")
+    gameplay_stats.remove_character(character_id)
+    clear_character_progress(character_id)
     
     return {"message": f"Character {character_id} deleted successfully"}
 
@@ -230,7 +451,7 @@ async def delete_character(character_id: int, request: Request):
 # 🔹 API: Admin - Make character public
 # ===============================================
 @app.put("/api/admin/characters/{character_id}/make-public")
-async def make_character_public(character_id: int, request: Request):
+def make_character_public(character_id: int, request: Request):
     """
     Set character status to "public" (admin only)
     Requires admin password in x-admin-password header
@@ -239,15 +460,16 @@ async def make_character_public(character_id: int, request: Request):
     if not password or not verify_admin_password(password):
         raise HTTPException(status_code=401, detail="Unauthorized: Invalid admin password")
     
-    characters = load_characters()
-    char = next((c for c in characters if c["id"] == character_id), None)
-    
-    if not char:
-        raise HTTPException(status_code=404, detail="Character not found")
-    
-    # Update status to "public"
-    char["status"] = "public"
-    save_characters(characters)
+    with catalog_lock:
+        characters = load_characters()
+        char = next((c for c in characters if c["id"] == character_id), None)
+
+        if not char:
+            raise HTTPException(status_code=404, detail="Character not found")
+
+        # Update status to "public"
+        char["status"] = "public"
+        save_characters(characters)
     
     return {"message": f"Character {character_id} is now public", "character": char}
 
@@ -256,7 +478,7 @@ async def make_character_public(character_id: int, request: Request):
 # 🔹 API: Admin - Make character private
 # ===============================================
 @app.put("/api/admin/characters/{character_id}/make-private")
-async def make_character_private(character_id: int, request: Request):
+def make_character_private(character_id: int, request: Request):
     """
     Set character status to "private" (admin only)
     Requires admin password in x-admin-password header
@@ -265,26 +487,136 @@ async def make_character_private(character_id: int, request: Request):
     if not password or not verify_admin_password(password):
         raise HTTPException(status_code=401, detail="Unauthorized: Invalid admin password")
     
-    characters = load_characters()
-    char = next((c for c in characters if c["id"] == character_id), None)
-    
-    if not char:
-        raise HTTPException(status_code=404, detail="Character not found")
-    
-    # Update status to "private"
-    char["status"] = "private"
-    save_characters(characters)
+    with catalog_lock:
+        characters = load_characters()
+        char = next((c for c in characters if c["id"] == character_id), None)
+
+        if not char:
+            raise HTTPException(status_code=404, detail="Character not found")
+
+        # Update status to "private"
+        char["status"] = "private"
+        save_characters(characters)
     
     return {"message": f"Character {character_id} is now private", "character": char}
 
 
 
 
+# ===============================================
+# 🔹 API: Admin - Gameplay stats
+# ===============================================
+# Plain function: the counters are read from SQLite
+@app.get("/api/admin/stats")
+def get_gameplay_stats(request: Request, character_id: int = None):
+    """
+    Return play counts, completion rates and per-question pass/fail counts (admin only)
+    Requires admin password in x-admin-password header
+    - character_id: only return stats for this character
+    """
+    password = request.headers.get("x-admin-password", None)
+    if not password or not verify_admin_password(password):
+        raise HTTPException(status_code=401, detail="Unauthorized: Invalid admin password")
+
+    if character_id is not None:
+        return gameplay_stats.summary(character_id)
+
+    return {"characters": gameplay_stats.summaries()}
+
+
+# ===============================================
+# 🔹 API: Admin - Bulk actions on characters
+# ===============================================
+@app.post("/api/admin/characters/bulk")
+def bulk_update_characters(
+    request: Request,
+    ids: List[int] = Form(...),
+    action: str = Form(...)
+):
+    """
+    Apply one action to many characters with a single save of characters.json (admin only)
+    Requires admin password in x-admin-password header
+    - action: "public", "private" or "delete"
+    Returns a result entry per requested id
+    """
+    password = request.headers.get("x-admin-password", None)
+    if not password or not verify_admin_password(password):
+        raise HTTPException(status_code=401, detail="Unauthorized: Invalid admin password")
+
+    if action not in ("public", "private", "delete"):
+        raise HTTPException(status_code=400, detail="Invalid action: must be 'public', 'private' or 'delete'")
+
+    results = []
+    changed = []
+    with catalog_lock:
+        characters = load_characters()
+        by_id = {c["id"]: c for c in characters}
+
+        for character_id in dict.fromkeys(ids):
+            char = by_id.get(character_id)
+            if not char:
+                results.append({"id": character_id, "success": False, "message": "Character not found"})
+                continue
+            if action == "delete":
+                del by_id[character_id]
+            else:
+                char["status"] = action
+            changed.append(char)
+            results.append({"id": character_id, "success": True})
+
+        # Single write for the whole batch
+        if changed:
+            characters = [c for c in characters if c["id"] in by_id]
+            save_characters(characters)
+
+        # Trash folders and unreferenced images against the catalog just saved, before an upload can reuse them
+        if action == "delete":
+            for char in changed:
+                release_blobs(character_image_paths(char) + [char.get("original_image")], characters)
+                folder_path = char.get("folder")
+                try:
+                    if move_to_trash(folder_path):
+                        logger.info("Moved folder to trash", extra={"folder": folder_path})
+                except Exception as e:
+                    logger.warning("Error moving folder %s to trash: %s", folder_path, e)
+
+    if action == "delete":
+        # Batched too: one statement / file write for the whole batch
+        deleted_ids = [char["id"] for char in changed]
+        delete_questions_many(deleted_ids)
+        question_bank.remove_sources(f"character:{character_id}" for character_id in deleted_ids)
+        gameplay_stats.remove_characters(deleted_ids)
+        for character_id in deleted_ids:
+            clear_character_progress(character_id)
+
+    return {
+        "action": action,
+        "updated": len(changed),
+        "results": results
+    }
+
+
+# ===============================================
+# 🔹 API: Images (content-addressed, cacheable forever)
+# ===============================================
+@app.get("/api/images/{blob_name}")
+async def get_image(blob_name: str):
+    """
+    Serve a stored image by its content hash name ("<sha256>.<ext>").
+    The URL changes whenever the content does, so it can be cached permanently.
+    """
+    path = blob_path_for_name(blob_name)
+    if not path or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(path, headers={"Cache-Control": "public, max-age=31536000, immutable"})
+
+
 # =====================================================
 # 🧠 API: Upload + Generate images + Save character
 # =====================================================
+# Plain function: stores the image and saves the catalog under catalog_lock
 @app.post("/api/upload")
-async def upload(
+def upload(
     request: Request,
     background_tasks: BackgroundTasks,
     name: str = Form(...),
@@ -334,7 +666,7 @@ async def upload(
                     raise HTTPException(status_code=400, detail=f"Question {idx}: answer '{q['answer']}' must be one of the options")
             
             validated_questions = questions
-            print(f"✅ All {len(questions)} questions validated successfully")
+            logger.debug("All %d questions validated successfully", len(questions))
             
         except json.JSONDecodeError as e:
             raise HTTPException(status_code=400, detail=f"Invalid JSON format: {str(e)}")
@@ -346,67 +678,67 @@ async def upload(
     # Ensure the uploads directory exists
     os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-    # === Determine the new character ID ===
-    characters = load_characters()
-    new_id = len(characters) + 1
-    existing_ids = {c.get("id", 0) for c in characters}
-    while new_id in existing_ids:
-        new_id += 1
-
-
-    # === Normalize folder name: "id_name" ===
-    safe_name = name.replace(" ", "_").lower()
-    folder_name = f"{new_id}_{safe_name}"
-    character_folder = os.path.join(UPLOAD_DIR, folder_name)
-    os.makedirs(character_folder, exist_ok=True)
-
-    # Save the original character image in a separate folder
     image_ext = os.path.splitext(image.filename)[1] or ".png"
-    image_path = os.path.join(character_folder, f"0{image_ext}")
-    original_image =image_path
-
-    with open(image_path, "wb") as f:
-        f.write(await image.read())
+    image_data = image.file.read()
+
+    # Store the image, pick the ID and add the character in one step, so concurrent catalog writes can't interleave
+    # (and a delete can't trash the blob this image was de-duplicated onto before the character references it)
+    with catalog_lock:
+        # Save the original character image in the blob store (identical files are stored once)
+        original_image = put_bytes(image_data, image_ext)
+
+        # === Determine the new character ID ===
+        characters = load_characters()
+        new_id = len(characters) + 1
+        existing_ids = {c.get("id", 0) for c in characters}
+        while new_id in existing_ids:
+            new_id += 1
+
+        # === Normalize folder name: "id_name" ===
+        safe_name = name.replace(" ", "_").lower()
+        folder_name = f"{new_id}_{safe_name}"
+        character_folder = os.path.join(UPLOAD_DIR, folder_name)
+        os.makedirs(character_folder, exist_ok=True)
+
+        # Update character information in JSON file
+        new_character = {
+            "id": new_id,
+            "name": name,
+            "original_image": original_image,
+            "images": [original_image],
+            "folder": character_folder,
+            "owner": user_id if user_id else "No one",
+            "status": "private"  # Default status is private
+        }
+        characters.append(new_character)
+        save_characters(characters)
 
-    # Save questions JSON and character info first
+    # Save questions JSON before images are generated
     if validated_questions:
         try: 
             # Edit id to increase from 1
             for idx, q in enumerate(validated_questions, start=1):
                 q['id'] = idx
-            questions_path = os.path.join(character_folder, "questions.json")
-            with open(questions_path, "w", encoding="utf-8") as f:
-                json.dump(validated_questions, f, ensure_ascii=False, indent=2)
-            print(f"✅ Questions saved to {questions_path}")
+            save_questions(new_id, validated_questions)
+            logger.info("Questions saved", extra={"character_id": new_id, "count": len(validated_questions)})
+            question_bank.add_questions(validated_questions, source=f"character:{new_id}")
         except Exception as e:
-            print(f"⚠️ Error saving questions: {e}")
-
-    # Update character information in JSON file
-    characters = load_characters()
-    new_character = {
-        "id": new_id,
-        "name": name,
-        "original_image": original_image,
-        "folder": character_folder,
-        "owner": user_id if user_id else "No one",
-        "status": "private"  # Default status is private
-    }
-    characters.append(new_character)
-    save_characters(characters)
+            logger.warning("Error saving questions: %s", e, extra={"character_id": new_id})
 
     # Define background task for generating images
     def generate_images_background():
         """Generate images in the background to avoid blocking other requests"""
         # Generate images through the AI API
         # Use the original image for every prompt (do not update image_path)
+        downloaded = []
         for idx, prompt in enumerate(prompts, start=1):
-            print(f"🎨 Processing prompt {idx}/{len(prompts)}: {prompt[:60]}...")
+            logger.info("Processing prompt %d/%d", idx, len(prompts), extra={"character_id": new_id, "prompt": prompt[:60]})
 
             # Always use the original image for each call
             result_url = call_ai_edit_image(api_key, original_image, prompt)
 
             if not result_url:
-                print(f"⚠️ Prompt {idx} failed, skipping.")
+                logger.warning("Prompt %d failed, skipping", idx, extra={"character_id": new_id})
                 continue
 
             try:
@@ -414,18 +746,27 @@ async def upload(
                 res = requests.get(result_url, timeout=60)
                 res.raise_for_status()
 
-                # Rename the file sequentially: 1.jpg, 2.jpg, ...
-                new_filename = f"{idx}{image_ext}"
-                new_path = os.path.join(character_folder, new_filename)
-
-                with open(new_path, "wb") as out_file:
-                    out_file.write(res.content)
-
-                print(f"✅ Image {idx} saved at: {new_path}")
+                # Images are stored and added to the character once at the end (order = prompt order)
+                downloaded.append(res.content)
+                logger.info("Image %d downloaded", idx, extra={"character_id": new_id})
 
             except Exception as e:
-                print(f"❌ Error downloading image {idx}: {e}")
+                logger.error("Error downloading image %d: %s", idx, e, extra={"character_id": new_id})
                 continue
+
+        if not downloaded:
+            return
+        # Single catalog write for the whole upload; blobs are stored under the lock like in upload()
+        with catalog_lock:
+            characters = load_characters()
+            char = next((c for c in characters if c["id"] == new_id), None)
+            if char is None:
+                # Character deleted while generating
+                return
+            new_paths = [put_bytes(data, image_ext) for data in downloaded]
+            char["images"] = char.get("images", []) + new_paths
+            save_characters(characters)
+        logger.info("Images saved", extra={"character_id": new_id, "paths": new_paths})
     
     # Add background task
     background_tasks.add_task(generate_images_background)
@@ -444,95 +785,198 @@ async def generate_questions_api(
     api_key: str = Form(...),
     topic: str = Form(...),
     difficulties: List[int] = Form(...),
-    num_questions: int = Form(...)
+    num_questions: int = Form(...),
+    use_bank: bool = Form(True)
 ):
     """
     Generate quiz questions using AI API based on topic and difficulty levels.
+    If the question bank already has enough questions for this topic/difficulties
+    (and use_bank is true), the quiz is assembled from the bank without calling the AI.
+    AI calls are rate limited per API key and globally; over the limit → 429.
     """
     try:
         # Convert difficulties from FormData (strings) to integers
         difficulties_int = [int(d) for d in difficulties]
+
+        # Try the question bank first
+        if use_bank and len(difficulties_int) >= num_questions:
+            questions = await run_in_threadpool(question_bank.assemble_quiz, topic, difficulties_int[:num_questions])
+            if questions:
+                return {
+                    "success": True,
+                    "questions": questions,
+                    "count": len(questions),
+                    "source": "bank"
+                }
         
+        # Rate limit upstream calls per client and globally
+        retry_after = generation_limiter.acquire(client_key(api_key))
+        if retry_after:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many question generation requests. Please try again later.",
+                headers={"Retry-After": str(retry_after)}
+            )
+
         # Run generate_questions in a separate thread to avoid blocking
-        loop = asyncio.get_event_loop()
-        questions = await loop.run_in_executor(
-            None,
-            generate_questions,
-            api_key,
-            topic,
-            difficulties_int,
-            num_questions
-        )
+        try:
+            # Copy the context so log lines from the worker thread keep the request id
+            loop = asyncio.get_event_loop()
+            questions = await loop.run_in_executor(
+                None,
+                functools.partial(contextvars.copy_context().run, generate_questions),
+                api_key,
+                topic,
+                difficulties_int,
+                num_questions
+            )
+        finally:
+            generation_limiter.release()
         
         if questions:
+            # Keep generated questions in the bank for later quizzes
+            await run_in_threadpool(
+                question_bank.add_questions, questions, topic=topic, difficulties=difficulties_int, source="generated"
+            )
             return {
                 "success": True,
                 "questions": questions,
-                "count": len(questions)
+                "count": len(questions),
+                "source": "ai"
             }
         else:
             return {
                 "success": False,
                 "message": "Failed to generate questions. Please try again."
             }
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Error generating questions: {e}")
+        logger.exception("Error generating questions")
         return {
             "success": False,
             "message": f"Error: {str(e)}"
         }
 
 
+# =====================================================
+# 🧠 API: Question bank
+# =====================================================
+# Question bank handlers are plain functions: the bank lives in SQLite
+@app.post("/api/question-bank/quiz")
+def assemble_quiz_from_bank(
+    topic: str = Form(...),
+    difficulties: List[int] = Form(...)
+):
+    """
+    Assemble a quiz from the question bank: one question per requested difficulty level.
+    """
+    questions = question_bank.assemble_quiz(topic, [int(d) for d in difficulties])
+    if not questions:
+        return {
+            "success": False,
+            "message": "Not enough questions in the bank for this topic and difficulty levels."
+        }
+    return {
+        "success": True,
+        "questions": questions,
+        "count": len(questions)
+    }
+
+
+@app.get("/api/admin/generation-limits")
+async def get_generation_limits(request: Request):
+    """
+    Return question generation limiter counters (admin only)
+    Requires admin password in x-admin-password header
+    """
+    password = request.headers.get("x-admin-password", None)
+    if not password or not verify_admin_password(password):
+        raise HTTPException(status_code=401, detail="Unauthorized: Invalid admin password")
+
+    return generation_limiter.snapshot()
+
+
+@app.get("/api/admin/question-bank")
+def get_question_bank_stats(request: Request):
+    """
+    Return question bank counts per topic and difficulty (admin only)
+    Requires admin password in x-admin-password header
+    """
+    password = request.headers.get("x-admin-password", None)
+    if not password or not verify_admin_password(password):
+        raise HTTPException(status_code=401, detail="Unauthorized: Invalid admin password")
+
+    return question_bank.stats()
+
+
+# Game endpoints are plain functions so FastAPI runs them in its threadpool:
+# catalog, question and progress lookups can wait on disk or the shared cache server
 @app.post("/api/question/{qid}")
-async def get_question(qid: int, character_id: int = Form(...)):
+def get_question(qid: int, request: Request, character_id: int = Form(...)):
     """
-    Return the question and corresponding image
+    Return the question and corresponding image.
+    Asking for question 1 starts a new game with full hearts, unless the saved game is still
+    at question 1; to resume, the frontend asks for the question returned by /api/progress.
     """
+    user_id = request.headers.get("x-user-id", None)
     # Find character by ID
     characters = load_characters()
     char = next((c for c in characters if c["id"] == character_id), None)
     if not char:
         return {"error": "❌ Character not found!"}
 
-    # Path to the folder containing image files
-    folder_path = char["folder"]
-
-    # Load questions for this character
+    # Look up the question for this character
     try:
-        questions = load_questions_for_character(folder_path)
+        total_questions = ensure_questions(char)
     except FileNotFoundError as e:
         return {"error": str(e)}
 
-    if qid > len(questions):
+    if qid > total_questions:
         return {"done": True, "message": "🎉 You have completed the game!"}
 
-    question = questions[qid - 1]
-
+    question = get_stored_question(character_id, qid)
+    if qid == 1:
+        progress = get_progress(user_id, character_id)
+        if not progress or progress["question_id"] != 1:
+            gameplay_stats.record_play(character_id)
+            clear_progress(user_id, character_id)
 
-    # Get list of files image
-    image_extensions = (".jpg", ".jpeg", ".png", ".gif", ".webp")
-    files = [
-        f for f in os.listdir(folder_path)
-        if os.path.isfile(os.path.join(folder_path, f))
-        and f.lower().endswith(image_extensions)
-    ]
 
-    # Sort alphabetically
-    files.sort()
+    # Ordered image paths (index 0 = original image)
+    images = character_image_paths(char)
 
-    image = files[qid - 1] if qid - 1 < len(files) else ""
-    image_path = os.path.join(folder_path, image)
-    image_data = image_to_base64_to_front_end(image_path)
+    image_path = images[qid - 1] if qid - 1 < len(images) else None
+    image_data, image_url = image_for_front_end(image_path)
     
-    return {"question": question, "image": image_data, "character_name": char["name"]}
+    return {"question": question, "image": image_data, "image_url": image_url, "character_name": char["name"]}
+
+
+@app.get("/api/progress/{character_id}")
+def get_game_progress(character_id: int, request: Request):
+    """
+    Return the saved progress of the current player (x-user-id) for a character:
+    the next question to answer and the hearts left, or null if there is no game in progress
+    """
+    user_id = request.headers.get("x-user-id", None)
+    progress = get_progress(user_id, character_id)
+    return {
+        "character_id": character_id,
+        "question_id": progress["question_id"] if progress else None,
+        "hearts": progress.get("hearts", MAX_HEARTS) if progress else None,
+        "updated_at": progress["updated_at"] if progress else None
+    }
 
 
 @app.post("/api/answer")
-async def submit_answer(question_id: int = Form(...), answer: str = Form(...), character_id: int = Form(...)):
+def submit_answer(request: Request, question_id: int = Form(...), answer: str = Form(...), character_id: int = Form(...)):
     """
     Check the answer. If correct → unlock the next image.
+    If wrong → lose a heart; the game is over after MAX_HEARTS wrong answers.
     If the player wins → return the final image.
+    Progress (next question + hearts left) is saved per x-user-id so the game can be resumed (see /api/progress).
     """
+    user_id = request.headers.get("x-user-id", None)
 
     # Folder containing images
     # Find character
@@ -541,61 +985,78 @@ async def submit_answer(question_id: int = Form(...), answer: str = Form(...), c
     if not char:
         return {"correct": False, "message": "❌ Character not found!"}
 
-    folder_path = char["folder"]
-
-    # Load questions for the character
+    # Look up the answered question
     try:
-        questions = load_questions_for_character(folder_path)
+        total_questions = ensure_questions(char)
     except FileNotFoundError as e:
         return {"correct": False, "message": str(e)}
 
-    question = questions[question_id - 1]
+    question = get_stored_question(character_id, question_id)
+    if not question:
+        return {"correct": False, "message": "❌ Question not found!"}
     correct = (answer.strip().lower() == question["answer"].strip().lower())
+    gameplay_stats.record_answer(character_id, question_id, correct)
+
+    progress = get_progress(user_id, character_id)
+    hearts = progress.get("hearts", MAX_HEARTS) if progress else MAX_HEARTS
 
     if not correct:
-        return {"correct": False, "message": "❌ Wrong answer! Game Over."}
+        hearts -= 1
+        if hearts <= 0:
+            clear_progress(user_id, character_id)
+            return {"correct": False, "hearts": 0, "message": "❌ Wrong answer! Game Over."}
+        # Same question again, one heart less
+        save_progress(user_id, character_id, question_id, hearts)
+        return {"correct": False, "hearts": hearts, "message": "❌ Wrong answer!"}
 
     next_id = question_id + 1
 
     
 
-    # Get list of files image
-    image_extensions = (".jpg", ".jpeg", ".png", ".gif", ".webp")
-    files = [
-        f for f in os.listdir(folder_path)
-        if os.path.isfile(os.path.join(folder_path, f))
-        and f.lower().endswith(image_extensions)
-    ]
-    files.sort()
+    # Ordered image paths (index 0 = original image)
+    images = character_image_paths(char)
 
     # If the player wins (no more questions)
-    if next_id > len(questions) or next_id > len(files)-1:
-        last_img = files[-1] if len(files) > 0 else None
-        image_data = None
-        if last_img:
-            img_path = os.path.join(folder_path, last_img)
-            ext = os.path.splitext(img_path)[1].lower()
-            mime_type = "image/png" if ext not in [".jpg", ".jpeg"] else "image/jpeg"
-            with open(img_path, "rb") as image_file:
-                b64 = base64.b64encode(image_file.read()).decode("utf-8")
-                image_data = f"data:{mime_type};base64,{b64}"
+    if next_id > total_questions or next_id > len(images)-1:
+        gameplay_stats.record_completion(character_id)
+        clear_progress(user_id, character_id)
+        last_img = images[-1] if len(images) > 0 else None
+        image_data, image_url = image_for_front_end(last_img)
 
         return {
             "correct": True,
             "message": "🎉 Congratulations! You won!",
             "next_question": None,
             "next_image": image_data,
+            "next_image_url": image_url,
         }
 
     # If there are still more questions
-    next_q = questions[next_id - 1]
-    next_img = files[next_id - 1] if next_id - 1 < len(files) else ""
-    next_img_path = os.path.join(folder_path, next_img)
+    next_q = get_stored_question(character_id, next_id)
+    save_progress(user_id, character_id, next_id, hearts)
+    next_img_path = images[next_id - 1] if next_id - 1 < len(images) else None
 
-    image_data = image_to_base64_to_front_end(next_img_path)
+    image_data, image_url = image_for_front_end(next_img_path)
 
     return {
         "correct": True,
         "next_question": next_q,
         "next_image": image_data,
-    }
\ No newline at end of file
+        "next_image_url": image_url,
+    }
+
+
+# =====================================================
+# 🌐 Frontend: serve the built React app (frontend/dist)
+# =====================================================
+# Registered last so every /api route above takes precedence
+if frontend_available():
+    @app.get("/{full_path:path}", include_in_schema=False)
+    async def serve_frontend(request: Request, full_path: str):
+        """
+        Serve the Vite build: hashed assets cached forever, index.html never cached,
+        precompressed .br/.gz files used when the client accepts them
+        """
+        if full_path.startswith("api/"):
+            raise HTTPException(status_code=404, detail="Not found")
+        return serve_frontend_file(request, full_path)
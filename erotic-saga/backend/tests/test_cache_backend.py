@@ -0,0 +1,212 @@
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+# Run from the backend directory: python -m unittest discover tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cache_backend import MemoryCache, RedisCache, create_cache  # noqa: E402
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    """
+    Tiny RESP2 server on 127.0.0.1 with GET / SET [EX] / DEL / INCR / AUTH / SELECT.
+    Expiry uses `self.now`, which tests move forward instead of sleeping.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, password=None):
+        super().__init__(("127.0.0.1", 0), FakeRedisHandler)
+        self.password = password
+        self.now = 0.0
+        self.data = {}          # key -> (expires_at or None, bytes)
+        self.commands = []
+        self.connections = 0
+        self.clients = set()
+        self._thread = threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}{host}:{port}/1"
+
+    def drop_connections(self):
+        for sock in list(self.clients):
+            sock.shutdown(socket.SHUT_RDWR)
+
+    def stop(self):
+        self.shutdown()
+        self.drop_connections()
+        self.server_close()
+
+    def execute(self, args):
+        cmd = args[0].upper()
+        self.commands.append([cmd] + args[1:])
+        if cmd == b"AUTH":
+            return b"+OK\r\n" if args[1].decode() == self.password else b"-ERR invalid password\r\n"
+        if cmd in (b"SELECT", b"PING"):
+            return b"+OK\r\n"
+        if cmd == b"GET":
+            value = self._get(args[1])
+            return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+        if cmd == b"SET":
+            ttl = int(args[4]) if len(args) > 4 and args[3].upper() == b"EX" else None
+            self.data[args[1]] = (self.now + ttl if ttl else None, args[2])
+            return b"+OK\r\n"
+        if cmd == b"DEL":
+            return b":%d\r\n" % (1 if self.data.pop(args[1], None) else 0)
+        if cmd == b"INCR":
+            value = int(self._get(args[1]) or 0) + 1
+            self.data[args[1]] = (None, str(value).encode())
+            return b":%d\r\n" % value
+        return b"-ERR unknown command\r\n"
+
+    def _get(self, key):
+        item = self.data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at is not None and expires_at <= self.now:
+            del self.data[key]
+            return None
+        return value
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.connections += 1
+        self.server.clients.add(self.connection)
+        try:
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    return
+                args = []
+                for _ in range(int(line[1:-2])):
+                    length = int(self.rfile.readline()[1:-2])
+                    args.append(self.rfile.read(length + 2)[:-2])
+                self.wfile.write(self.server.execute(args))
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.server.clients.discard(self.connection)
+
+
+class MemoryCacheTest(unittest.TestCase):
+    def test_get_set_delete_incr(self):
+        cache = MemoryCache()
+        self.assertIsNone(cache.get("missing"))
+        cache.set("a", {"x": [1, 2]})
+        self.assertEqual(cache.get("a"), {"x": [1, 2]})
+        cache.delete("a")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.incr("n"), 1)
+        self.assertEqual(cache.incr("n"), 2)
+
+    def test_expiry(self):
+        cache = MemoryCache()
+        with mock.patch("utils.cache_backend.time.monotonic", return_value=100.0):
+            cache.set("a", "value", ttl=10)
+            cache.set("b", "forever")
+        with mock.patch("utils.cache_backend.time.monotonic", return_value=109.9):
+            self.assertEqual(cache.get("a"), "value")
+        with mock.patch("utils.cache_backend.time.monotonic", return_value=110.0):
+            self.assertIsNone(cache.get("a"))
+            self.assertEqual(cache.get("b"), "forever")
+
+
+class RedisCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeRedisServer(password="secret")
+        self.cache = RedisCache(self.server.url, timeout=1.0)
+
+    def tearDown(self):
+        self.cache._close()
+        self.server.stop()
+
+    def test_create_cache_picks_backend(self):
+        self.assertIsInstance(create_cache(""), MemoryCache)
+        self.assertIsInstance(create_cache(self.server.url), RedisCache)
+
+    def test_connect_authenticates_and_selects_db(self):
+        self.cache.get("a")
+        self.assertEqual(self.server.commands[:2], [[b"AUTH", b"secret"], [b"SELECT", b"1"]])
+
+    def test_get_set_with_ttl(self):
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.set("a", {"name": "é", "n": [1, 2]}, ttl=10)
+        self.assertEqual(self.server.commands[-1][3:], [b"EX", b"10"])
+        self.assertEqual(self.cache.get("a"), {"name": "é", "n": [1, 2]})
+        self.server.now = 10
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_set_without_ttl(self):
+        self.cache.set("a", 1)
+        self.assertEqual(len(self.server.commands[-1]), 3)
+        self.server.now = 10 ** 9
+        self.assertEqual(self.cache.get("a"), 1)
+
+    def test_delete(self):
+        self.cache.set("a", 1)
+        self.cache.delete("a")
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_incr(self):
+        self.assertEqual(self.cache.incr("n"), 1)
+        self.assertEqual(self.cache.incr("n"), 2)
+        self.assertEqual(self.cache.get("n"), 2)
+
+    def test_one_connection_per_thread(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.cache.incr("n"))) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sorted(results), [1, 2, 3, 4])
+        self.assertEqual(self.server.connections, 4)
+
+    def test_reconnects_after_connection_drop(self):
+        self.cache.set("a", 1)
+        self.server.drop_connections()
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_server_error_is_a_miss(self):
+        cache = RedisCache(self.server.url.replace("secret", "wrong"), timeout=1.0)
+        self.assertIsNone(cache.get("a"))
+        cache._close()
+
+    def test_backoff_after_outage(self):
+        self.cache.set("a", 1)
+        self.server.stop()
+
+        start = time.monotonic()
+        self.assertIsNone(self.cache.get("a"))
+        self.assertGreaterEqual(self.cache._down_until, start + RedisCache.RETRY_AFTER)
+
+        # While backing off, calls are misses without touching the network
+        with mock.patch.object(self.cache, "command", side_effect=AssertionError("network used")):
+            self.assertIsNone(self.cache.get("a"))
+            self.assertIsNone(self.cache.incr("n"))
+            self.cache.set("a", 2)
+
+        # Once the delay is over the server is tried again
+        self.server = FakeRedisServer(password="secret")
+        self.cache.port = self.server.server_address[1]
+        self.cache._down_until = 0.0
+        self.cache.set("a", 3)
+        self.assertEqual(self.cache.get("a"), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
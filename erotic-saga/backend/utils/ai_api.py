@@ -1,5 +1,6 @@
 import requests
 import json
+import logging
 import time
 import os
 import threading
@@ -10,6 +11,9 @@ AI_API_URL = "https://agentic.eternalai.org/prompt"
 RESULT_API_URL = "https://agent-api.eternalai.org/result"
 
 from utils.file_manager import encode_image_base64
+from utils.logger import get_logger
+
+logger = get_logger("ai_api")
 
 
 def call_ai_edit_image(api_key: str, image_path: str, prompt: str):
@@ -64,17 +68,17 @@ def call_ai_edit_image(api_key: str, image_path: str, prompt: str):
             "agent": "uncensored-reimagine"
         }
 
-        print(f"📤 Sending AI edit request for {filename}: {prompt[:60]}...")
+        logger.info("Sending AI edit request", extra={"image_file": filename, "prompt": prompt[:60]})
         response = requests.post(AI_API_URL, headers=headers, json=payload)
         response.raise_for_status()
 
         data = response.json()
         request_id = data.get("request_id")
         if not request_id:
-            print("❌ No request_id returned from API.")
+            logger.error("No request_id returned from API")
             return None
 
-        print(f"🆔 Request ID: {request_id}")
+        logger.info("AI edit request accepted", extra={"upstream_request_id": request_id})
 
         # ===== Step 2: Poll result using while loop =====
         polling_url = f"{RESULT_API_URL}?agent=uncensored-reimagine&request_id={request_id}"
@@ -98,7 +102,7 @@ def call_ai_edit_image(api_key: str, image_path: str, prompt: str):
                     log_json = json.loads(log)
                     progress = log_json.get("progress", last_progress)
                     if progress != last_progress:
-                        print(f"⏳ Progress: {progress}%")
+                        logger.debug("AI edit progress", extra={"upstream_request_id": request_id, "progress": progress})
                         last_progress = progress
                 except json.JSONDecodeError:
                     pass
@@ -109,23 +113,23 @@ def call_ai_edit_image(api_key: str, image_path: str, prompt: str):
                     or result_json.get("result_url")
                     or result_json.get("result_image_url")
                 )
-                print(f"✅ Done! Result URL: {result_url}")
+                logger.info("AI edit done", extra={"upstream_request_id": request_id, "result_url": result_url})
                 return result_url
 
             elif status == "failed":
-                print("❌ Generation failed:", result_json)
+                logger.error("AI edit failed", extra={"upstream_request_id": request_id, "result": result_json})
                 return None
 
             # Timeout after 5 minutes to prevent infinite waiting
             if time.time() - start_time > 300:
-                print("⚠️ Timeout: waited 5 minutes without success.")
+                logger.warning("AI edit timed out after 5 minutes", extra={"upstream_request_id": request_id})
                 return None
 
     except requests.exceptions.RequestException as e:
-        print("❌ Network error:", e)
+        logger.error("Network error during AI edit: %s", e)
         return None
-    except Exception as e:
-        print("❌ Unexpected error:", e)
+    except Exception:
+        logger.exception("Unexpected error during AI edit")
         return None
 
 
@@ -134,10 +138,10 @@ def extractjson(content):
     Extract JSON array from text content, handling markdown code blocks and formatting.
     """
     if not content:
-        print("Error: No content received in the response.")
+        logger.error("No content received in the response")
         return None
 
-    print("\n📝 Extracting JSON from response...")
+    logger.debug("Extracting JSON from response")
 
     # --- Step 1: Remove markdown code blocks (```json or ```) if present ---
     cleaned = re.sub(r"```(?:json)?", "", content)
@@ -145,7 +149,7 @@ def extractjson(content):
     # --- Step 2: Find the first JSON array in the content ---
     match = re.search(r"\[\s*{[\s\S]*}\s*\]", cleaned)
     if not match:
-        print("⚠️ Could not find JSON array in response.")
+        logger.warning("Could not find JSON array in response")
         return None
 
     json_str = match.group(0).strip()
@@ -153,11 +157,10 @@ def extractjson(content):
     # --- Step 3: Parse JSON ---
     try:
         data = json.loads(json_str)
-        print(f"✅ Extracted {len(data)} items successfully!")
+        logger.debug("Extracted %d items from response", len(data))
         return data
     except json.JSONDecodeError as e:
-        print(f"❌ JSON parse error: {e}")
-        print(f"⚠️ JSON snippet: {json_str[:300]}")
+        logger.error("JSON parse error: %s", e, extra={"snippet": json_str[:300]})
         return None
 
 
@@ -224,7 +227,7 @@ Questions and answers must be in English.'''
             "stream": True
         }
 
-        print(f"📤 Generating {num_questions} questions about '{topic}'...")
+        logger.info("Generating questions", extra={"topic": topic, "num_questions": num_questions})
         
         # Send POST request with streaming
         response = requests.post(AI_API_URL, headers=headers, json=payload, stream=True, timeout=90)
@@ -233,7 +236,8 @@ Questions and answers must be in English.'''
         # Handle streaming response
         content = ""
         request_id = "unknown"
-        print("Streaming response started...")
+        logger.debug("Streaming response started")
+        log_tokens = logger.isEnabledFor(logging.DEBUG)
         
         try:
             for line in response.iter_lines():
@@ -247,7 +251,7 @@ Questions and answers must be in English.'''
                             # Get request_id from first chunk if available
                             if request_id == "unknown" and "id" in data:
                                 request_id = data.get("id", "unknown")
-                                print(f"Request ID: {request_id}")
+                                logger.info("Question generation accepted", extra={"upstream_request_id": request_id})
                             
                             # Extract content from choices
                             choices = data.get("choices", [])
@@ -256,32 +260,33 @@ Questions and answers must be in English.'''
                                 chunk_content = delta.get("content", "")
                                 if chunk_content:
                                     content += chunk_content
-                                    print(chunk_content, end="", flush=True)
+                                    if log_tokens:
+                                        logger.debug("Stream chunk", extra={"chunk": chunk_content})
                                 
                                 # Check finish_reason to end streaming
                                 finish_reason = choice.get("finish_reason")
                                 if finish_reason:
-                                    print(f"\nStream finished with reason: {finish_reason}")
+                                    logger.debug("Stream finished", extra={"finish_reason": finish_reason})
                                     break
                         except json.JSONDecodeError:
                             continue  # Skip invalid JSON chunks
                     elif line == "data: [DONE]":  # SSE end signal
                         break
         except Exception as e:
-            print(f"\nError processing streaming response: {e}")
+            logger.error("Error processing streaming response: %s", e)
             return None
 
         # Parse JSON from the complete content
         questions_json = extractjson(content)
         
         if questions_json:
-            print(f"✅ Generated {len(questions_json)} questions successfully!")
+            logger.info("Generated %d questions", len(questions_json), extra={"topic": topic})
         
         return questions_json
 
     except requests.exceptions.RequestException as e:
-        print(f"❌ Network error: {e}")
+        logger.error("Network error during question generation: %s", e)
         return None
-    except Exception as e:
-        print(f"❌ Unexpected error: {e}")
+    except Exception:
+        logger.exception("Unexpected error during question generation")
         return None
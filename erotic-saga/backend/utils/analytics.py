@@ -0,0 +1,254 @@
+import os
+import sqlite3
+import threading
+
+from utils.logger import get_logger
+from utils.question_store import QUESTIONS_DB
+
+logger = get_logger("analytics")
+
+FLUSH_INTERVAL = float(os.environ.get("ANALYTICS_FLUSH_INTERVAL", "30"))
+
+
+# ===============================================
+# 🔹 Gameplay analytics (in-memory deltas, added to SQLite periodically)
+# ===============================================
+
+def _new_entry():
+    return {"plays": 0, "completions": 0, "questions": {}}
+
+
+def _add_entry(total, entry):
+    """
+    Add the counters of `entry` to `total` in place.
+    """
+    total["plays"] += entry["plays"]
+    total["completions"] += entry["completions"]
+    for qid, (passed, failed) in entry["questions"].items():
+        counts = total["questions"].setdefault(qid, [0, 0])
+        counts[0] += passed
+        counts[1] += failed
+
+
+def _summarize(character_id: int, entry):
+    questions = {
+        int(qid): {
+            "passed": passed,
+            "failed": failed,
+            "pass_rate": round(passed / (passed + failed), 3) if passed + failed else None,
+        }
+        for qid, (passed, failed) in entry["questions"].items()
+    }
+    return {
+        "character_id": character_id,
+        "plays": entry["plays"],
+        "completions": entry["completions"],
+        "completion_rate": round(entry["completions"] / entry["plays"], 3) if entry["plays"] else None,
+        "questions": dict(sorted(questions.items())),
+    }
+
+
+class GameplayStats:
+    """
+    Per-character counters:
+    - plays: games started (question 1 requested)
+    - completions: games won
+    - questions: {question number: [passed, failed]}
+    Increments are buffered in memory and added to the database every FLUSH_INTERVAL seconds
+    (`plays = plays + ?`), so several workers or nodes sharing the database never overwrite each other.
+    Reads query the database when asked and add this worker's pending increments.
+    """
+
+    def __init__(self, db_path: str = QUESTIONS_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pending = {}      # character id -> increments since the last flush
+        self._flusher = None
+
+    # ---------- storage ----------
+
+    def _connect(self):
+        """
+        Return this thread's connection to the database, creating the tables if needed.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS character_stats (
+                    character_id INTEGER PRIMARY KEY,
+                    plays INTEGER NOT NULL DEFAULT 0,
+                    completions INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS question_stats (
+                    character_id INTEGER NOT NULL,
+                    qnum INTEGER NOT NULL,
+                    passed INTEGER NOT NULL DEFAULT 0,
+                    failed INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (character_id, qnum)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def _write(self, conn, entries):
+        """
+        Add per-character increments to the database (caller commits).
+        """
+        conn.executemany(
+            """
+            INSERT INTO character_stats (character_id, plays, completions) VALUES (?, ?, ?)
+            ON CONFLICT (character_id) DO UPDATE SET
+                plays = plays + excluded.plays,
+                completions = completions + excluded.completions
+            """,
+            [(cid, e["plays"], e["completions"]) for cid, e in entries.items()],
+        )
+        conn.executemany(
+            """
+            INSERT INTO question_stats (character_id, qnum, passed, failed) VALUES (?, ?, ?, ?)
+            ON CONFLICT (character_id, qnum) DO UPDATE SET
+                passed = passed + excluded.passed,
+                failed = failed + excluded.failed
+            """,
+            [
+                (cid, int(qnum), passed, failed)
+                for cid, e in entries.items()
+                for qnum, (passed, failed) in e["questions"].items()
+            ],
+        )
+
+    # ---------- counters ----------
+
+    def _entry(self, character_id: int):
+        entry = self._pending.get(character_id)
+        if entry is None:
+            entry = _new_entry()
+            self._pending[character_id] = entry
+        return entry
+
+    def record_play(self, character_id: int):
+        with self._lock:
+            self._entry(character_id)["plays"] += 1
+
+    def record_answer(self, character_id: int, question_id: int, correct: bool):
+        with self._lock:
+            counts = self._entry(character_id)["questions"].setdefault(str(question_id), [0, 0])
+            counts[0 if correct else 1] += 1
+
+    def record_completion(self, character_id: int):
+        with self._lock:
+            self._entry(character_id)["completions"] += 1
+
+    def remove_character(self, character_id: int):
+        self.remove_characters([character_id])
+
+    def remove_characters(self, character_ids):
+        """
+        Drop the counters of several characters in one transaction (one DELETE per table).
+        """
+        character_ids = list(dict.fromkeys(character_ids))
+        if not character_ids:
+            return
+        with self._lock:
+            for character_id in character_ids:
+                self._pending.pop(character_id, None)
+        placeholders = ", ".join("?" * len(character_ids))
+        conn = self._connect()
+        with conn:
+            conn.execute(f"DELETE FROM character_stats WHERE character_id IN ({placeholders})", character_ids)
+            conn.execute(f"DELETE FROM question_stats WHERE character_id IN ({placeholders})", character_ids)
+
+    def _read(self, character_id: int = None):
+        """
+        Return {character id: totals} for one character (or all of them):
+        the database totals plus this worker's pending increments.
+        """
+        where, params = ("WHERE character_id = ?", (character_id,)) if character_id is not None else ("", ())
+        conn = self._connect()
+        entries = {}
+        for cid, plays, completions in conn.execute(
+            f"SELECT character_id, plays, completions FROM character_stats {where}", params
+        ):
+            entries[cid] = {"plays": plays, "completions": completions, "questions": {}}
+        for cid, qnum, passed, failed in conn.execute(
+            f"SELECT character_id, qnum, passed, failed FROM question_stats {where}", params
+        ):
+            entries.setdefault(cid, _new_entry())["questions"][str(qnum)] = [passed, failed]
+        with self._lock:
+            for cid, pending in self._pending.items():
+                if character_id is not None and cid != character_id:
+                    continue
+                _add_entry(entries.setdefault(cid, _new_entry()), pending)
+        return entries
+
+    def plays_by_character(self):
+        """
+        Return {character id: plays} (one query, for sorting by popularity).
+        """
+        plays = dict(self._connect().execute("SELECT character_id, plays FROM character_stats"))
+        with self._lock:
+            for cid, pending in self._pending.items():
+                plays[cid] = plays.get(cid, 0) + pending["plays"]
+        return plays
+
+    def summary(self, character_id: int):
+        return _summarize(character_id, self._read(character_id).get(character_id) or _new_entry())
+
+    def summaries(self):
+        """
+        Return the summary of every character with counters, most played first.
+        """
+        stats = [_summarize(cid, entry) for cid, entry in self._read().items()]
+        stats.sort(key=lambda x: x["plays"], reverse=True)
+        return stats
+
+    def flush(self):
+        """
+        Add the pending increments to the database (together with the ones flushed by other workers).
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        conn = self._connect()
+        try:
+            with conn:
+                self._write(conn, pending)
+        except (OSError, sqlite3.Error):
+            # Put the increments back so the next flush retries
+            with self._lock:
+                for cid, entry in pending.items():
+                    _add_entry(self._entry(cid), entry)
+            raise
+
+    def start_flusher(self):
+        """
+        Start the background thread that flushes counters every FLUSH_INTERVAL seconds (idempotent).
+        """
+        if self._flusher is not None:
+            return
+
+        def flush_forever():
+            stop = threading.Event()
+            while not stop.wait(FLUSH_INTERVAL):
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.warning("Error flushing analytics: %s", e)
+
+        self._flusher = threading.Thread(target=flush_forever, name="analytics-flusher", daemon=True)
+        self._flusher.start()
+
+
+# Shared counters used by the API
+gameplay_stats = GameplayStats()
@@ -0,0 +1,184 @@
+import hashlib
+import os
+import re
+import time
+from collections import Counter
+
+from utils.file_manager import BLOB_DIR, list_character_images, image_to_base64_to_front_end
+from utils.logger import get_logger
+from utils.trash import move_to_trash
+
+logger = get_logger("blob_store")
+
+BLOB_NAME = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]+$")
+
+# Unreferenced blobs younger than this are kept: an upload may be about to reference them
+GC_GRACE_SECONDS = 600
+
+
+# ===============================================
+# 🔹 Content-addressed image storage
+# ===============================================
+# Images are stored once as uploads/blobs/<first 2 hex chars>/<sha256>.<ext>;
+# characters reference them from "original_image" and "images".
+
+def _blob_path(digest: str, ext: str) -> str:
+    return os.path.join(BLOB_DIR, digest[:2], f"{digest}{ext.lower()}")
+
+
+def put_bytes(data: bytes, ext: str) -> str:
+    """
+    Store bytes and return the blob path. Identical bytes map to the same existing file.
+    """
+    path = _blob_path(hashlib.sha256(data).hexdigest(), ext or ".png")
+    try:
+        # Already stored: refresh mtime so garbage collection doesn't race the new reference
+        os.utime(path)
+        return path
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+
+def put_file(file_path: str) -> str:
+    with open(file_path, "rb") as f:
+        return put_bytes(f.read(), os.path.splitext(file_path)[1])
+
+
+def is_blob_path(path) -> bool:
+    return bool(path) and os.path.normpath(path).startswith(os.path.normpath(BLOB_DIR) + os.sep)
+
+
+def blob_path_for_name(blob_name: str):
+    """
+    Map a public blob name ("<sha256>.<ext>") to its path, or None if the name is invalid.
+    """
+    if not BLOB_NAME.match(blob_name):
+        return None
+    return os.path.join(BLOB_DIR, blob_name[:2], blob_name)
+
+
+def blob_url(path):
+    """
+    Immutable URL of a blob image (None for legacy folder images).
+    """
+    if not is_blob_path(path):
+        return None
+    return f"/api/images/{os.path.basename(path)}"
+
+
+def image_for_front_end(path):
+    """
+    Return (image, image_url) for an API response: a blob is only referenced by its URL
+    (cached by the browser), a legacy folder image is still sent inline as a base64 data URI.
+    """
+    if not path:
+        return None, None
+    url = blob_url(path)
+    if url:
+        return None, url
+    return image_to_base64_to_front_end(path), None
+
+
+def reference_counts(characters) -> Counter:
+    """
+    Count catalog references per blob path.
+    """
+    counts = Counter()
+    for char in characters:
+        refs = set(char.get("images") or [])
+        if char.get("original_image"):
+            refs.add(char["original_image"])
+        counts.update(os.path.normpath(p) for p in refs if is_blob_path(p))
+    return counts
+
+
+def release_blobs(paths, characters) -> int:
+    """
+    Move the given blobs to the trash when no character references them anymore.
+    `characters` is the catalog after the change.
+    """
+    counts = reference_counts(characters)
+    released = 0
+    for path in {os.path.normpath(p) for p in paths if is_blob_path(p)}:
+        if counts[path] == 0 and move_to_trash(path):
+            released += 1
+    return released
+
+
+def collect_garbage(characters) -> int:
+    """
+    Move every unreferenced blob older than GC_GRACE_SECONDS to the trash
+    (kept there for TRASH_RETENTION_SECONDS). Does nothing when the catalog is empty:
+    a missing or unreadable characters.json would make every blob unreferenced.
+    """
+    if not os.path.isdir(BLOB_DIR):
+        return 0
+    if not characters:
+        logger.warning("Catalog is empty, skipping blob garbage collection")
+        return 0
+    counts = reference_counts(characters)
+    cutoff = time.time() - GC_GRACE_SECONDS
+    released = 0
+    for root, _, files in os.walk(BLOB_DIR):
+        for name in files:
+            path = os.path.normpath(os.path.join(root, name))
+            if counts[path]:
+                continue
+            try:
+                expired = os.path.getmtime(path) < cutoff
+            except FileNotFoundError:
+                continue    # Moved to the trash by another worker's collection
+            if expired and move_to_trash(path):
+                released += 1
+    if released:
+        logger.info("Unreferenced blobs moved to trash", extra={"count": released})
+    return released
+
+
+def migrate_character(char) -> list:
+    """
+    Copy a legacy character's folder images into the blob store and point the character at them.
+    Keeps the current image order. Returns the legacy file paths that can now be removed.
+    """
+    if char.get("images") or not char.get("folder"):
+        return []
+    folder_path = char["folder"]
+    legacy_files = [os.path.join(folder_path, f) for f in list_character_images(folder_path)]
+    char["images"] = [put_file(p) for p in legacy_files]
+    original = char.get("original_image")
+    if original and os.path.exists(original):
+        char["original_image"] = put_file(original)
+        if original not in legacy_files:
+            legacy_files.append(original)
+    return legacy_files
+
+
+if __name__ == "__main__":
+    # Usage (from the backend directory, with the server stopped): python -m utils.blob_store
+    # The migration rewrites characters.json without catalog_lock, then deletes the folder images
+    from utils.file_manager import load_characters, save_characters
+    from utils.logger import setup_logging
+
+    setup_logging()
+    characters = load_characters()
+    legacy_files = []
+    for char in characters:
+        files = migrate_character(char)
+        if files:
+            logger.info("Migrated images", extra={"character_id": char["id"], "count": len(char["images"])})
+        legacy_files.extend(files)
+    save_characters(characters)
+
+    # Remove the folder copies only once the catalog points at the blobs
+    for path in legacy_files:
+        os.remove(path)
+
+    counts = reference_counts(characters)
+    print(f"🎉 Migrated {len(legacy_files)} files into {len(counts)} unique blobs "
+          f"({sum(counts.values())} references)")
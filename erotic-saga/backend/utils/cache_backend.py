@@ -0,0 +1,195 @@
+import json
+import os
+import socket
+import threading
+import time
+from urllib.parse import urlparse, unquote
+
+from utils.logger import get_logger
+
+logger = get_logger("cache_backend")
+
+# "redis://[:password@]host[:port][/db]" to share cache and game state between nodes; empty = in-process
+CACHE_URL = os.environ.get("CACHE_URL", "")
+
+
+# ===============================================
+# 🔹 Cache / session backends
+# ===============================================
+# Values are anything JSON-serializable. Both backends expose the same methods:
+#   get(key) → value or None, set(key, value, ttl=None), delete(key), incr(key) → new value
+
+class MemoryCache:
+    """
+    In-process cache (single node; lost on restart).
+    Stored values are returned as-is, so callers must not modify them in place.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}     # key -> (expires_at or None, value)
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value, ttl: int = None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl if ttl else None, value)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            expires_at, value = self._data.get(key, (None, 0))
+            self._data[key] = (expires_at, int(value) + 1)
+            return int(value) + 1
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisCache:
+    """
+    Minimal client for the Redis protocol (RESP2): GET / SET / DEL / INCR.
+    Works with Redis, Valkey, KeyDB and other RESP-compatible servers. Values are stored as JSON.
+    Each thread has its own connection, so concurrent requests don't wait on each other.
+    Calls block on the network: use them from sync endpoints or worker threads, not on the event loop.
+    """
+
+    def __init__(self, url: str, timeout: float = 2.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._local = threading.local()     # sock, reader of this thread's connection
+        self._down_until = 0.0
+
+    # ---------- protocol ----------
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._local.sock = sock
+        self._local.reader = sock.makefile("rb")
+        try:
+            if self.password:
+                self._call("AUTH", self.password)
+            if self.db:
+                self._call("SELECT", str(self.db))
+        except RedisError:
+            # Don't keep a connection that isn't authenticated / on the right database
+            self._close()
+            raise
+
+    def _close(self):
+        for name in ("reader", "sock"):
+            closable = getattr(self._local, name, None)
+            if closable is not None:
+                try:
+                    closable.close()
+                except OSError:
+                    pass
+            setattr(self._local, name, None)
+
+    def _call(self, *args):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._local.sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._local.reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by cache server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RedisError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = self._local.reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(payload)
+            return None if count == -1 else [self._read_reply() for _ in range(count)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    def command(self, *args):
+        """
+        Send one command on this thread's connection, reconnecting once if it was lost.
+        """
+        for attempt in (1, 2):
+            try:
+                if getattr(self._local, "sock", None) is None:
+                    self._connect()
+                return self._call(*args)
+            except (OSError, ConnectionError):
+                self._close()
+                if attempt == 2:
+                    raise
+
+    # ---------- cache API ----------
+    # A cache outage degrades to cache misses instead of failing requests;
+    # after a connection failure the server is skipped for RETRY_AFTER seconds
+
+    RETRY_AFTER = 5.0
+
+    def _safe(self, *args):
+        if time.monotonic() < self._down_until:
+            return None
+        try:
+            return self.command(*args)
+        except (OSError, ConnectionError) as e:
+            self._down_until = time.monotonic() + self.RETRY_AFTER
+            logger.warning("Cache server unreachable (%s), retrying in %ss", e, self.RETRY_AFTER)
+            return None
+        except RedisError as e:
+            logger.warning("Cache command %s failed: %s", args[0], e)
+            return None
+
+    def get(self, key: str):
+        raw = self._safe("GET", key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, value, ttl: int = None):
+        data = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        if ttl:
+            self._safe("SET", key, data, "EX", int(ttl))
+        else:
+            self._safe("SET", key, data)
+
+    def delete(self, key: str):
+        self._safe("DEL", key)
+
+    def incr(self, key: str):
+        return self._safe("INCR", key)
+
+
+def create_cache(url: str = CACHE_URL):
+    if url.startswith("redis://"):
+        logger.info("Using shared cache backend", extra={"host": urlparse(url).hostname})
+        return RedisCache(url)
+    return MemoryCache()
+
+
+# Shared cache used by the catalog, questions and game state
+cache = create_cache()
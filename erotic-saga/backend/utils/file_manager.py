@@ -1,12 +1,39 @@
 import base64
 import os
 import json
+import threading
+import time
+from collections import OrderedDict
+
+from utils.cache_backend import cache
+from utils.profiling import timed
 
 UPLOAD_DIR = "uploads"
+BLOB_DIR = os.path.join(UPLOAD_DIR, "blobs")
 CHARACTERS_FILE = "characters.json"
 
+# Bumped in the shared cache on every save so all nodes drop their parsed copy
+CATALOG_VERSION_KEY = "catalog:version"
+
+# Seconds between reads of the shared catalog version (a save on another node shows up within this delay)
+CATALOG_VERSION_CHECK_INTERVAL = float(os.environ.get("CATALOG_VERSION_CHECK_INTERVAL", "1"))
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp")
+
+# Memory budget for cached base64 images (bytes)
+IMAGE_CACHE_BYTES = int(os.environ.get("IMAGE_CACHE_BYTES", str(64 * 1024 * 1024)))
+
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+_cache_lock = threading.Lock()
+
+# Hold for every load_characters → modify → save_characters sequence (handlers and background threads)
+catalog_lock = threading.Lock()
+_characters_cache = {"stamp": None, "characters": None}
+_catalog_version = {"value": None, "checked_at": None}
+_manifest_cache = {}            # folder -> (mtime_ns, [image file names])
+_image_cache = OrderedDict()    # image path -> (mtime_ns, data URI), least recently used first
+_image_cache_size = 0
+
 
 def save_image_file(file):
     # Get the original file extension (.png, .jpg, .jpeg)
@@ -30,7 +57,24 @@ def encode_image_base64(path):
         return base64.b64encode(f.read()).decode("utf-8")
 
 
+@timed("image")
 def image_to_base64_to_front_end(image_path):
+    """
+    Return the image as a data URI for the frontend (None if missing).
+    Results are kept in an LRU cache bounded by IMAGE_CACHE_BYTES and invalidated on file change.
+    """
+    global _image_cache_size
+    try:
+        mtime_ns = os.stat(image_path).st_mtime_ns
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+    with _cache_lock:
+        cached = _image_cache.get(image_path)
+        if cached and cached[0] == mtime_ns:
+            _image_cache.move_to_end(image_path)
+            return cached[1]
+
     try:
         ext = os.path.splitext(image_path)[1].lower()  # get file extension (.png, .jpg, .jpeg)
         mime_type = "image/png"  # default
@@ -40,24 +84,129 @@ def image_to_base64_to_front_end(image_path):
         with open(image_path, "rb") as image_file:
             image_base64 = base64.b64encode(image_file.read()).decode("utf-8")
             image_data = f"data:{mime_type};base64,{image_base64}"
-    except FileNotFoundError:
-        image_data = None
+    except (FileNotFoundError, IsADirectoryError):
+        return None
+
+    if len(image_data) <= IMAGE_CACHE_BYTES:
+        with _cache_lock:
+            old = _image_cache.pop(image_path, None)
+            if old:
+                _image_cache_size -= len(old[1])
+            _image_cache[image_path] = (mtime_ns, image_data)
+            _image_cache_size += len(image_data)
+            while _image_cache_size > IMAGE_CACHE_BYTES:
+                _, (_, evicted) = _image_cache.popitem(last=False)
+                _image_cache_size -= len(evicted)
 
     return image_data
 
 
+def image_cache_is_full(extra_bytes: int = 0) -> bool:
+    with _cache_lock:
+        return _image_cache_size + extra_bytes > IMAGE_CACHE_BYTES
+
+
+@timed("listing")
+def list_character_images(folder_path):
+    """
+    Return the sorted image file names of a character folder.
+    Cached per folder and refreshed when the folder changes (new image generated, etc.).
+    """
+    try:
+        mtime_ns = os.stat(folder_path).st_mtime_ns
+    except FileNotFoundError:
+        return []
+
+    cached = _manifest_cache.get(folder_path)
+    if cached and cached[0] == mtime_ns:
+        return cached[1]
+
+    files = sorted(
+        f for f in os.listdir(folder_path)
+        if os.path.isfile(os.path.join(folder_path, f))
+        and f.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    _manifest_cache[folder_path] = (mtime_ns, files)
+    return files
+
+
+def character_image_paths(char):
+    """
+    Return the ordered image paths of a character (index 0 = original image).
+    Uses the "images" list (content-addressed blobs) when present,
+    otherwise the image files of the character folder.
+    """
+    if char.get("images"):
+        return char["images"]
+    folder_path = char.get("folder")
+    if not folder_path:
+        return []
+    return [os.path.join(folder_path, f) for f in list_character_images(folder_path)]
+
+
 # ===============================================
 # 🔹 Utility: Load & Save character list
 # ===============================================
 
-def load_characters():
+def _shared_catalog_version():
+    """
+    Return the shared catalog version, read from the cache at most every CATALOG_VERSION_CHECK_INTERVAL seconds.
+    """
+    now = time.monotonic()
+    checked_at = _catalog_version["checked_at"]
+    if checked_at is None or now - checked_at >= CATALOG_VERSION_CHECK_INTERVAL:
+        _catalog_version["value"] = cache.get(CATALOG_VERSION_KEY)
+        _catalog_version["checked_at"] = now
+    return _catalog_version["value"]
+
+
+def catalog_stamp():
+    """
+    Identify the current catalog: file stat + shared catalog version.
+    Changes whenever any worker or node saves the catalog (see load_characters).
+    """
     if not os.path.exists(CHARACTERS_FILE):
         with open(CHARACTERS_FILE, "w", encoding="utf-8") as f:
             json.dump([], f, ensure_ascii=False, indent=2)
-    with open(CHARACTERS_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+
+    st = os.stat(CHARACTERS_FILE)
+    return st.st_mtime_ns, st.st_size, _shared_catalog_version()
+
+
+def _copy_character(char):
+    # "images" is the only nested value of a character; everything else is a scalar
+    char = dict(char)
+    if char.get("images") is not None:
+        char["images"] = list(char["images"])
+    return char
+
+
+@timed("catalog")
+def load_characters():
+    """
+    Return the character list. The parsed file is cached and re-read only when it changes
+    (file stat or the shared catalog version, so a save on another node is picked up too);
+    the shared version is only checked every CATALOG_VERSION_CHECK_INTERVAL seconds.
+    Each call gets its own copies of the character dicts and of their "images" lists,
+    so callers can modify them (in place too) without touching the cached catalog.
+    """
+    stamp = catalog_stamp()
+    with _cache_lock:
+        if _characters_cache["stamp"] != stamp:
+            with open(CHARACTERS_FILE, "r", encoding="utf-8") as f:
+                _characters_cache["characters"] = json.load(f)
+            _characters_cache["stamp"] = stamp
+        characters = _characters_cache["characters"]
+    return [_copy_character(c) for c in characters]
 
 
 def save_characters(characters):
-    with open(CHARACTERS_FILE, "w", encoding="utf-8") as f:
+    # Write to a temp file then swap it in, so readers never see a half-written list
+    tmp_path = f"{CHARACTERS_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
         json.dump(characters, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, CHARACTERS_FILE)
+    with _cache_lock:
+        _characters_cache["stamp"] = None
+    _catalog_version["value"] = cache.incr(CATALOG_VERSION_KEY)
+    _catalog_version["checked_at"] = time.monotonic()
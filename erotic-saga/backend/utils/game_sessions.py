@@ -0,0 +1,56 @@
+import time
+
+from utils.cache_backend import cache
+
+# How long an unfinished game can be resumed
+SESSION_TTL = 7 * 24 * 3600
+
+# Wrong answers a player can make before the game is over (hearts shown by the frontend)
+MAX_HEARTS = 3
+
+
+# ===============================================
+# 🔹 Game progress (per user and character)
+# ===============================================
+# Kept in the shared cache so a player can continue on any node, and after a restart
+# when a Redis-protocol server is configured (CACHE_URL).
+
+def _epoch_key(character_id: int) -> str:
+    return f"game:character:{character_id}:epoch"
+
+
+def _key(user_id: str, character_id: int) -> str:
+    # The epoch changes when the character is deleted, so a new character reusing the id starts clean
+    epoch = cache.get(_epoch_key(character_id)) or 0
+    return f"game:{user_id}:{character_id}:{epoch}"
+
+
+def save_progress(user_id: str, character_id: int, question_id: int, hearts: int = MAX_HEARTS):
+    """
+    Remember the next question the player has to answer and the hearts left.
+    """
+    if not user_id:
+        return
+    cache.set(
+        _key(user_id, character_id),
+        {"question_id": question_id, "hearts": hearts, "updated_at": int(time.time())},
+        ttl=SESSION_TTL,
+    )
+
+
+def get_progress(user_id: str, character_id: int):
+    if not user_id:
+        return None
+    return cache.get(_key(user_id, character_id))
+
+
+def clear_progress(user_id: str, character_id: int):
+    if user_id:
+        cache.delete(_key(user_id, character_id))
+
+
+def clear_character_progress(character_id: int):
+    """
+    Drop every player's progress for a character (call when it is deleted).
+    """
+    cache.incr(_epoch_key(character_id))
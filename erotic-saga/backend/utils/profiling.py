@@ -0,0 +1,122 @@
+import contextlib
+import contextvars
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "").lower() in ("1", "true", "yes")
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", "0.005"))
+
+# Timings of the current request: {name: [total seconds, count]}, or None when not collecting
+_timings_var = contextvars.ContextVar("server_timings", default=None)
+
+# Sampler profiling the current request, or None
+_sampler_var = contextvars.ContextVar("stack_sampler", default=None)
+
+
+# ===============================================
+# 🔹 Server-Timing breakdown
+# ===============================================
+
+@contextlib.contextmanager
+def timed(name: str):
+    """
+    Add the duration of the block to the current request's Server-Timing entry `name`.
+    When the request is profiled, point its sampler at the thread running the block
+    (plain `def` endpoints run in the threadpool, not on the event loop thread).
+    Does nothing (beyond one context variable lookup) when timings aren't being collected.
+    """
+    timings = _timings_var.get()
+    if timings is None:
+        yield
+        return
+    sampler = _sampler_var.get()
+    if sampler is not None:
+        sampler.thread_id = threading.get_ident()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry = timings.setdefault(name, [0.0, 0])
+        entry[0] += time.perf_counter() - start
+        entry[1] += 1
+
+
+def start_timings():
+    return _timings_var.set({})
+
+
+def finish_timings(token) -> str:
+    """
+    Stop collecting and return the Server-Timing header value, e.g.
+    'catalog;dur=1.20;desc="x1", image;dur=3.40;desc="x10"'
+    """
+    timings = _timings_var.get() or {}
+    _timings_var.reset(token)
+    return ", ".join(
+        f'{name};dur={total * 1000:.2f};desc="x{count}"'
+        for name, (total, count) in timings.items()
+    )
+
+
+# ===============================================
+# 🔹 Sampling profiler (collapsed stacks for flame graphs)
+# ===============================================
+
+def should_profile(admin_triggered: bool) -> bool:
+    return admin_triggered or (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE)
+
+
+class StackSampler:
+    """
+    Sample the stack of one thread every PROFILE_INTERVAL seconds from a helper thread.
+    Output uses the "collapsed stacks" format (one `frame;frame;frame count` line per stack)
+    read by flamegraph.pl, speedscope and similar tools.
+    Once started, timed() blocks of the request move `thread_id` to the thread doing the work.
+    The event loop thread is shared, so samples taken there may include other requests running concurrently.
+    """
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._token = _sampler_var.set(self)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        _sampler_var.reset(self._token)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def write(self, label: str) -> str:
+        """
+        Write the collected stacks to PROFILE_DIR and return the file path.
+        """
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        safe_label = re.sub(r"[^\w.-]+", "_", label).strip("_")[:80]
+        path = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}_{safe_label}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
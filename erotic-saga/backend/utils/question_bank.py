@@ -0,0 +1,207 @@
+import json
+import re
+import sqlite3
+import threading
+
+from utils.logger import get_logger
+from utils.question_store import QUESTIONS_DB, ensure_questions, load_questions
+
+logger = get_logger("question_bank")
+
+DEFAULT_TOPIC = "general"
+
+# Source of questions taken from a character quiz: "character:<id>"
+CHARACTER_SOURCE = "character:"
+
+
+# ===============================================
+# 🔹 Global question bank (indexed by topic + difficulty)
+# ===============================================
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for de-duplication / topic matching:
+    lowercase, drop punctuation, collapse whitespace.
+    """
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s]", " ", (text or "").lower())).strip()
+
+
+def _clamp_difficulty(value) -> int:
+    try:
+        return min(10, max(1, int(value)))
+    except (TypeError, ValueError):
+        return 1
+
+
+class QuestionBank:
+    """
+    Questions shared across characters, stored in the question_bank table of questions.db
+    so every worker and node reads and adds to the same bank.
+    - De-duplicated by normalized question text (primary key)
+    - Indexed by (normalized topic, difficulty) for quiz assembly
+    Character quizzes (source "character:<id>") are stored without a topic, unless a question
+    declares its own: they were written for that character, not for a topic.
+    """
+
+    def __init__(self, db_path: str = QUESTIONS_DB):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _connect(self):
+        """
+        Return this thread's connection to the database, creating the table if needed.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS question_bank (
+                    qkey TEXT PRIMARY KEY,
+                    body TEXT NOT NULL,
+                    topic TEXT,
+                    difficulty INTEGER NOT NULL,
+                    source TEXT NOT NULL
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS question_bank_topic ON question_bank (topic, difficulty)")
+            conn.execute("CREATE INDEX IF NOT EXISTS question_bank_source ON question_bank (source)")
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def seed_from_characters(self, characters) -> int:
+        """
+        First run only (empty bank): add the existing character quizzes.
+        Walks every character, so it runs in the startup warm-up, not in a request.
+        """
+        if self._connect().execute("SELECT 1 FROM question_bank LIMIT 1").fetchone():
+            return 0
+        added = 0
+        for char in characters:
+            try:
+                ensure_questions(char)
+            except (FileNotFoundError, KeyError, json.JSONDecodeError):
+                continue
+            questions = load_questions(char["id"])
+            added += self.add_questions(questions, source=f"{CHARACTER_SOURCE}{char['id']}")
+        logger.info("Question bank seeded with %d questions from characters", added)
+        return added
+
+    def add_questions(self, questions, topic: str = DEFAULT_TOPIC, difficulties=None, source: str = "") -> int:
+        """
+        Add questions to the bank, skipping duplicates.
+        Difficulty comes from the matching entry in difficulties, then the question's own
+        "difficulty" field, then its position (character quizzes get harder as they go).
+        Character quizzes only get the topic their questions declare.
+        Returns the number of new questions.
+        """
+        from_character = source.startswith(CHARACTER_SOURCE)
+        rows = []
+        for pos, q in enumerate(questions or []):
+            if not isinstance(q, dict) or not all(k in q for k in ("question", "options", "answer")):
+                continue
+            key = normalize_text(q["question"])
+            if not key:
+                continue
+            if difficulties and pos < len(difficulties):
+                difficulty = difficulties[pos]
+            else:
+                difficulty = q.get("difficulty", pos + 1)
+            question_topic = q.get("topic") or (None if from_character else topic or DEFAULT_TOPIC)
+            body = {"question": q["question"], "options": q["options"], "answer": q["answer"]}
+            rows.append((
+                key,
+                json.dumps(body, ensure_ascii=False),
+                None if question_topic is None else normalize_text(question_topic) or DEFAULT_TOPIC,
+                _clamp_difficulty(difficulty),
+                source,
+            ))
+        if not rows:
+            return 0
+        conn = self._connect()
+        with conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO question_bank (qkey, body, topic, difficulty, source) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            return conn.total_changes - before
+
+    def assemble_quiz(self, topic: str, difficulties):
+        """
+        Build a quiz with one question per requested difficulty (exact level first,
+        then the nearest level within ±1). Returns None if the bank can't cover every slot.
+        """
+        topic_key = normalize_text(topic) or DEFAULT_TOPIC
+        conn = self._connect()
+        used = []
+        quiz = []
+        for wanted in difficulties:
+            wanted = _clamp_difficulty(wanted)
+            picked = None
+            for level in (wanted, wanted - 1, wanted + 1):
+                placeholders = ", ".join("?" * len(used))
+                picked = conn.execute(
+                    f"""
+                    SELECT qkey, body FROM question_bank
+                    WHERE topic = ? AND difficulty = ? AND qkey NOT IN ({placeholders})
+                    ORDER BY RANDOM() LIMIT 1
+                    """,
+                    [topic_key, level, *used],
+                ).fetchone()
+                if picked:
+                    break
+            if picked is None:
+                return None
+            used.append(picked[0])
+            entry = json.loads(picked[1])
+            quiz.append({
+                "id": len(quiz) + 1,
+                "question": entry["question"],
+                "options": list(entry["options"]),
+                "answer": entry["answer"],
+            })
+        return quiz
+
+    def remove_source(self, source: str) -> int:
+        """
+        Remove every question added from this source (e.g. a deleted character). Returns the count.
+        """
+        return self.remove_sources([source])
+
+    def remove_sources(self, sources) -> int:
+        """
+        Remove every question added from any of these sources in one statement. Returns the count.
+        """
+        sources = list(dict.fromkeys(sources))
+        if not sources:
+            return 0
+        placeholders = ", ".join("?" * len(sources))
+        conn = self._connect()
+        with conn:
+            return conn.execute(f"DELETE FROM question_bank WHERE source IN ({placeholders})", sources).rowcount
+
+    def stats(self):
+        conn = self._connect()
+        topics = {}
+        total = character_only = 0
+        for topic, difficulty, count in conn.execute(
+            "SELECT topic, difficulty, COUNT(*) FROM question_bank GROUP BY topic, difficulty"
+        ):
+            total += count
+            if topic is None:
+                character_only += count
+            else:
+                topics.setdefault(topic, {})[difficulty] = count
+        return {
+            "total": total,
+            "character_only": character_only,
+            "topics": topics,
+        }
+
+
+# Shared bank used by the API
+question_bank = QuestionBank()
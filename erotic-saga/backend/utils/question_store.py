@@ -0,0 +1,186 @@
+import json
+import os
+import sqlite3
+import threading
+
+from utils.cache_backend import cache, CACHE_URL
+from utils.logger import get_logger
+from utils.profiling import timed
+from utils.question_loader import load_questions_for_character
+
+QUESTIONS_DB = "questions.db"
+
+# Questions are read through the shared cache (utils.cache_backend) for this long.
+# Without a shared cache (no CACHE_URL) each worker would keep a copy that deletes on other
+# workers can't invalidate (and ids are reused after a delete), so SQLite is read directly.
+QUESTION_CACHE_TTL = 3600 if CACHE_URL else 0
+
+_local = threading.local()
+
+logger = get_logger("question_store")
+
+
+# ===============================================
+# 🔹 Question storage (single SQLite table)
+# ===============================================
+
+def _connect():
+    """
+    Return this thread's connection to the questions database, creating the table if needed.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(QUESTIONS_DB)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS questions (
+                character_id INTEGER NOT NULL,
+                qnum INTEGER NOT NULL,
+                body TEXT NOT NULL,
+                PRIMARY KEY (character_id, qnum)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.commit()
+        _local.conn = conn
+    return conn
+
+
+def _invalidate(character_id: int, count: int = None):
+    """
+    Drop the cached questions and count of a character (`count` = its stored question count, if known).
+    """
+    if not QUESTION_CACHE_TTL:
+        return
+    if count is None:
+        count = count_questions(character_id)
+    for qnum in range(1, count + 1):
+        cache.delete(f"questions:{character_id}:{qnum}")
+    cache.delete(f"questions:{character_id}:count")
+
+
+def save_questions(character_id: int, questions):
+    """
+    Replace all questions of a character. Questions are numbered from 1 in list order.
+    """
+    _invalidate(character_id)
+    conn = _connect()
+    with conn:
+        conn.execute("DELETE FROM questions WHERE character_id = ?", (character_id,))
+        conn.executemany(
+            "INSERT INTO questions (character_id, qnum, body) VALUES (?, ?, ?)",
+            [
+                (character_id, idx, json.dumps(q, ensure_ascii=False))
+                for idx, q in enumerate(questions, start=1)
+            ],
+        )
+
+
+@timed("questions")
+def get_question(character_id: int, qnum: int):
+    """
+    Return question number qnum (1-based) of a character, or None.
+    """
+    key = f"questions:{character_id}:{qnum}"
+    question = cache.get(key) if QUESTION_CACHE_TTL else None
+    if question is not None:
+        return question
+
+    row = _connect().execute(
+        "SELECT body FROM questions WHERE character_id = ? AND qnum = ?",
+        (character_id, qnum),
+    ).fetchone()
+    if not row:
+        return None
+    question = json.loads(row[0])
+    if QUESTION_CACHE_TTL:
+        cache.set(key, question, ttl=QUESTION_CACHE_TTL)
+    return question
+
+
+def count_questions(character_id: int) -> int:
+    row = _connect().execute(
+        "SELECT COUNT(*) FROM questions WHERE character_id = ?", (character_id,)
+    ).fetchone()
+    return row[0]
+
+
+def load_questions(character_id: int):
+    rows = _connect().execute(
+        "SELECT body FROM questions WHERE character_id = ? ORDER BY qnum", (character_id,)
+    ).fetchall()
+    return [json.loads(r[0]) for r in rows]
+
+
+def delete_questions(character_id: int):
+    delete_questions_many([character_id])
+
+
+def delete_questions_many(character_ids):
+    """
+    Delete the questions of several characters with a single statement (bulk delete).
+    """
+    character_ids = list(dict.fromkeys(character_ids))
+    if not character_ids:
+        return
+    placeholders = ", ".join("?" * len(character_ids))
+    conn = _connect()
+    counts = dict(conn.execute(
+        f"SELECT character_id, COUNT(*) FROM questions WHERE character_id IN ({placeholders}) GROUP BY character_id",
+        character_ids,
+    ).fetchall())
+    for character_id in character_ids:
+        _invalidate(character_id, counts.get(character_id, 0))
+    with conn:
+        conn.execute(f"DELETE FROM questions WHERE character_id IN ({placeholders})", character_ids)
+
+
+@timed("questions")
+def ensure_questions(char) -> int:
+    """
+    Return the number of stored questions for a character.
+    Characters not migrated yet are imported from their folder's questions.json on first access.
+    Raises FileNotFoundError if the character has no questions anywhere.
+    """
+    key = f"questions:{char['id']}:count"
+    total = cache.get(key) if QUESTION_CACHE_TTL else None
+    if total:
+        return total
+
+    total = count_questions(char["id"])
+    if total == 0:
+        questions = load_questions_for_character(char["folder"])
+        save_questions(char["id"], questions)
+        total = len(questions)
+    if QUESTION_CACHE_TTL:
+        cache.set(key, total, ttl=QUESTION_CACHE_TTL)
+    return total
+
+
+def migrate_from_folders(characters) -> int:
+    """
+    Import questions.json from every character folder into the store.
+    Returns the number of characters migrated.
+    """
+    migrated = 0
+    for char in characters:
+        folder = char.get("folder")
+        if not folder or not os.path.exists(os.path.join(folder, "questions.json")):
+            logger.warning("No questions.json for character", extra={"character_id": char.get("id"), "folder": folder})
+            continue
+        questions = load_questions_for_character(folder)
+        save_questions(char["id"], questions)
+        migrated += 1
+        logger.info("Migrated %d questions", len(questions), extra={"character_id": char["id"]})
+    return migrated
+
+
+if __name__ == "__main__":
+    # Usage (from the backend directory): python -m utils.question_store
+    from utils.file_manager import load_characters
+    from utils.logger import setup_logging
+
+    setup_logging()
+    count = migrate_from_folders(load_characters())
+    print(f"🎉 Migrated questions for {count} characters into {QUESTIONS_DB}")
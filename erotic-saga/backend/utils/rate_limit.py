@@ -0,0 +1,106 @@
+import hashlib
+import math
+import os
+import threading
+import time
+
+
+# ===============================================
+# 🔹 Rate limiting for upstream question generation
+# ===============================================
+
+class GenerationLimiter:
+    """
+    Guards calls to the upstream AI:
+    - token bucket per client key (refill rate_per_minute, burst capacity)
+    - global cap on in-flight upstream calls
+    Both checks are non-blocking: callers get a retry-after delay instead of waiting.
+    """
+
+    MAX_TRACKED_KEYS = 10000
+
+    def __init__(self, rate_per_minute: float, burst: int, max_in_flight: int):
+        # Fail at startup rather than on the first request (a zero rate would divide by zero)
+        if not rate_per_minute > 0:
+            raise ValueError(f"GENERATE_RATE_PER_MINUTE must be greater than 0 (got {rate_per_minute})")
+        if burst < 1:
+            raise ValueError(f"GENERATE_BURST must be at least 1 (got {burst})")
+        if max_in_flight < 1:
+            raise ValueError(f"GENERATE_MAX_IN_FLIGHT must be at least 1 (got {max_in_flight})")
+        self.rate_per_second = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self._lock = threading.Lock()
+        self._buckets = {}      # key -> [tokens, last refill time]
+        self._in_flight = 0
+        self.counters = {
+            "allowed": 0,
+            "rejected_rate_limit": 0,
+            "rejected_busy": 0,
+            "peak_in_flight": 0,
+        }
+
+    def acquire(self, key: str):
+        """
+        Try to start an upstream call for this client.
+        Returns 0 on success (caller must call release() afterwards),
+        or the number of seconds to wait before retrying.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate_per_second)
+            if tokens < 1:
+                self._buckets[key] = [tokens, now]
+                self.counters["rejected_rate_limit"] += 1
+                return math.ceil((1 - tokens) / self.rate_per_second)
+            if self._in_flight >= self.max_in_flight:
+                self._buckets[key] = [tokens, now]
+                self.counters["rejected_busy"] += 1
+                return 1
+            self._buckets[key] = [tokens - 1, now]
+            self._in_flight += 1
+            self.counters["allowed"] += 1
+            self.counters["peak_in_flight"] = max(self.counters["peak_in_flight"], self._in_flight)
+            if len(self._buckets) > self.MAX_TRACKED_KEYS:
+                self._prune(now)
+            return 0
+
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                **self.counters,
+                "in_flight": self._in_flight,
+                "tracked_clients": len(self._buckets),
+                "limits": {
+                    "rate_per_minute": self.rate_per_second * 60,
+                    "burst": self.burst,
+                    "max_in_flight": self.max_in_flight,
+                },
+            }
+
+    def _prune(self, now: float):
+        # Drop buckets that have refilled completely; they behave like new clients
+        full_after = self.burst / self.rate_per_second
+        for key in [k for k, (_, last) in self._buckets.items() if now - last >= full_after]:
+            del self._buckets[key]
+
+
+def client_key(api_key: str) -> str:
+    """
+    Identify the caller by a hash of the API key: the credential that pays for the upstream call.
+    (x-user-id is chosen by the client, so a new value per request would get a fresh bucket.)
+    """
+    return "key:" + hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+# Limits are read once at startup from the environment
+generation_limiter = GenerationLimiter(
+    rate_per_minute=float(os.environ.get("GENERATE_RATE_PER_MINUTE", "5")),
+    burst=int(os.environ.get("GENERATE_BURST", "3")),
+    max_in_flight=int(os.environ.get("GENERATE_MAX_IN_FLIGHT", "4")),
+)
@@ -0,0 +1,227 @@
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+
+
+# ===============================================
+# 🔹 Character name search index (prefix + trigram)
+# ===============================================
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize a character name for searching:
+    strip accents, lowercase, and collapse anything non-alphanumeric to single spaces.
+    """
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return re.sub(r"[^0-9a-z]+", " ", stripped.lower()).strip()
+
+
+def _trigrams(text: str):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _SortedPairs:
+    """
+    (key, id) pairs kept sorted in two parallel lists, so the ids of a key-prefix range
+    can be sliced out without touching each pair in Python.
+    """
+
+    def __init__(self, pairs=()):
+        pairs = sorted(pairs)
+        self.keys = [key for key, _ in pairs]
+        self.ids = [char_id for _, char_id in pairs]
+
+    def _position(self, key: str, char_id: int) -> int:
+        lo = bisect.bisect_left(self.keys, key)
+        hi = bisect.bisect_right(self.keys, key, lo)
+        return bisect.bisect_left(self.ids, char_id, lo, hi)
+
+    def insert(self, key: str, char_id: int):
+        idx = self._position(key, char_id)
+        self.keys.insert(idx, key)
+        self.ids.insert(idx, char_id)
+
+    def remove(self, key: str, char_id: int):
+        idx = self._position(key, char_id)
+        if idx < len(self.ids) and self.keys[idx] == key and self.ids[idx] == char_id:
+            del self.keys[idx]
+            del self.ids[idx]
+
+    def ids_with_prefix(self, prefix: str) -> set:
+        start = bisect.bisect_left(self.keys, prefix)
+        end = bisect.bisect_left(self.keys, prefix + "\uffff", start)
+        return set(self.ids[start:end])
+
+
+class CharacterSearchIndex:
+    """
+    In-memory index over normalized character names.
+    - Full-name prefix matches come from a sorted name list (bisect range)
+    - Short queries (< 3 chars) use a sorted token list (bisect prefix lookup)
+    - Longer queries intersect trigram posting sets, then verify by substring
+    Visibility is kept as id sets, so filtering and ranking are set operations.
+    The index keeps the characters themselves so a results page doesn't need the whole catalog,
+    and follows the catalog stamp so saves from any worker or node show up (see refresh).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._stamp = None              # catalog stamp the index reflects
+        self._reset()
+
+    def _reset(self):
+        self._names = {}                # id -> normalized name
+        self._characters = {}           # id -> character dict (as stored in characters.json)
+        self._private = set()           # ids with status != "public"
+        self._owned = {}                # owner -> set(id)
+        self._sorted_names = _SortedPairs()
+        self._tokens = _SortedPairs()
+        self._trigrams = {}             # trigram -> set(id)
+
+    def rebuild(self, characters, stamp=None):
+        with self._lock:
+            self._reset()
+            names, tokens = [], []
+            for char in characters:
+                name = self._add_locked(char, sorted_lists=False)
+                names.append((name, char["id"]))
+                tokens.extend((token, char["id"]) for token in set(name.split()))
+            self._sorted_names = _SortedPairs(names)
+            self._tokens = _SortedPairs(tokens)
+            self._stamp = stamp
+            self._loaded = True
+
+    def refresh(self, load_characters, stamp):
+        """
+        Bring the index up to date with the catalog identified by `stamp` (file_manager.catalog_stamp).
+        After the first build, the catalog is compared with the indexed characters and only
+        added, removed or edited characters are re-indexed.
+        """
+        if self._loaded and self._stamp == stamp:
+            return
+        characters = load_characters()
+        if not self._loaded:
+            self.rebuild(characters, stamp)
+            return
+        with self._lock:
+            current = set()
+            for char in characters:
+                current.add(char["id"])
+                if self._characters.get(char["id"]) != char:
+                    self._remove_locked(char["id"])
+                    self._add_locked(char)
+            for char_id in self._names.keys() - current:
+                self._remove_locked(char_id)
+            self._stamp = stamp
+
+    def get_characters(self, ids):
+        """
+        Return copies of the indexed characters with these ids (unknown ids are skipped).
+        """
+        with self._lock:
+            return [dict(self._characters[i]) for i in ids if i in self._characters]
+
+    def search(self, query: str, user_id: str = None, admin: bool = False, offset: int = 0, limit: int = None):
+        """
+        Return (total matches, ids of the requested page), best matches first:
+        full-name prefix, then word prefix, then substring; ties by id.
+        Only the first offset + limit matches are ordered.
+        Visibility follows get_characters: status == "public" OR owner == user_id.
+        """
+        q = normalize_name(query)
+        if not q or offset < 0:
+            return 0, []
+
+        with self._lock:
+            prefix = self._sorted_names.ids_with_prefix(q)
+            if len(q) < 3 and " " not in q:
+                # Every token match is a full-name or a word prefix match
+                word = self._tokens.ids_with_prefix(q) - prefix
+                substring = set()
+            else:
+                # Start from the rarest trigram to keep intersections small
+                grams = sorted(_trigrams(q), key=lambda g: len(self._trigrams.get(g, ())))
+                candidates = set(self._trigrams.get(grams[0], ()))
+                for gram in grams[1:]:
+                    if not candidates:
+                        break
+                    candidates &= self._trigrams.get(gram, set())
+                candidates -= prefix
+                spaced = f" {q}"
+                word, substring = set(), set()
+                for char_id in candidates:
+                    name = self._names[char_id]
+                    if spaced in name:
+                        word.add(char_id)
+                    elif q in name:
+                        substring.add(char_id)
+
+            ranked = [prefix, word, substring]
+            if not admin:
+                owned = self._owned.get(user_id, set()) if user_id is not None else set()
+                ranked = [(ids - self._private) | (ids & owned) for ids in ranked]
+
+        total = sum(len(ids) for ids in ranked)
+        wanted = None if limit is None else offset + limit
+        page = []
+        for ids in ranked:
+            if wanted is not None and len(page) >= wanted:
+                break
+            page.extend(sorted(ids) if wanted is None else heapq.nsmallest(wanted - len(page), ids))
+        return total, page[offset:wanted]
+
+    # ---------- internal helpers (lock must be held) ----------
+
+    def _set_visibility_locked(self, char):
+        char_id = char["id"]
+        if char.get("status", "public") != "public":
+            self._private.add(char_id)
+        self._owned.setdefault(char.get("owner", "public"), set()).add(char_id)
+
+    def _unset_visibility_locked(self, character_id: int):
+        self._private.discard(character_id)
+        owner = self._characters[character_id].get("owner", "public")
+        ids = self._owned.get(owner)
+        if ids is not None:
+            ids.discard(character_id)
+            if not ids:
+                del self._owned[owner]
+
+    def _add_locked(self, char, sorted_lists: bool = True) -> str:
+        char_id = char["id"]
+        name = normalize_name(char.get("name", ""))
+        self._names[char_id] = name
+        self._characters[char_id] = dict(char)
+        self._set_visibility_locked(char)
+        if sorted_lists:
+            self._sorted_names.insert(name, char_id)
+            for token in set(name.split()):
+                self._tokens.insert(token, char_id)
+        for gram in _trigrams(name):
+            self._trigrams.setdefault(gram, set()).add(char_id)
+        return name
+
+    def _remove_locked(self, character_id: int):
+        name = self._names.get(character_id)
+        if name is None:
+            return
+        self._unset_visibility_locked(character_id)
+        del self._names[character_id]
+        del self._characters[character_id]
+        self._sorted_names.remove(name, character_id)
+        for token in set(name.split()):
+            self._tokens.remove(token, character_id)
+        for gram in _trigrams(name):
+            ids = self._trigrams.get(gram)
+            if ids is not None:
+                ids.discard(character_id)
+                if not ids:
+                    del self._trigrams[gram]
+
+
+# Shared index used by the API
+character_index = CharacterSearchIndex()
@@ -0,0 +1,75 @@
+import mimetypes
+import os
+import re
+
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, Response
+
+FRONTEND_DIST = os.environ.get("FRONTEND_DIST", os.path.join("..", "frontend", "dist"))
+
+# Vite names built assets like "index-BxQ3k9aZ.js": the hash changes whenever the content does
+HASHED_ASSET = re.compile(r"^assets/.+-[A-Za-z0-9_-]{8,}\.[a-z0-9]+$")
+
+# Preferred order when the client accepts several encodings
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+# ===============================================
+# 🔹 Serve the built frontend (Vite dist/)
+# ===============================================
+
+def frontend_available() -> bool:
+    return os.path.isfile(os.path.join(FRONTEND_DIST, "index.html"))
+
+
+def _cache_control(rel_path: str) -> str:
+    if rel_path == "index.html":
+        return "no-cache"
+    if HASHED_ASSET.match(rel_path):
+        return "public, max-age=31536000, immutable"
+    return "public, max-age=3600"
+
+
+def _accepted_encodings(request: Request):
+    accepted = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name and params.strip().replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def serve_frontend_file(request: Request, full_path: str):
+    """
+    Return the dist/ file for full_path (index.html for client-side routes),
+    using a precompressed .br / .gz variant when the client accepts it.
+    """
+    dist_root = os.path.realpath(FRONTEND_DIST)
+    rel_path = full_path.strip("/") or "index.html"
+    file_path = os.path.realpath(os.path.join(dist_root, rel_path))
+    if not file_path.startswith(dist_root + os.sep) or not os.path.isfile(file_path):
+        # Paths with an extension are real files that don't exist; anything else is a React route
+        if os.path.splitext(rel_path)[1]:
+            raise HTTPException(status_code=404, detail="Not found")
+        rel_path = "index.html"
+        file_path = os.path.join(dist_root, rel_path)
+
+    media_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+    headers = {"Cache-Control": _cache_control(rel_path), "Vary": "Accept-Encoding"}
+    content_encoding = None
+
+    accepted = _accepted_encodings(request)
+    for encoding, suffix in ENCODINGS:
+        if encoding in accepted and os.path.isfile(file_path + suffix):
+            file_path += suffix
+            content_encoding = encoding
+            break
+
+    st = os.stat(file_path)
+    headers["ETag"] = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+    return FileResponse(file_path, media_type=media_type, headers=headers)
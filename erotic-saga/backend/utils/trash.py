@@ -0,0 +1,129 @@
+import os
+import shutil
+import threading
+import time
+
+from utils.file_manager import UPLOAD_DIR, BLOB_DIR
+from utils.logger import get_logger
+
+logger = get_logger("trash")
+
+TRASH_DIR = os.path.join(UPLOAD_DIR, ".trash")
+
+# Reaper rate limit: at most one folder removed every REAPER_DELAY seconds
+REAPER_DELAY = float(os.environ.get("TRASH_REAPER_DELAY", "2"))
+
+# Trashed entries are kept this long before being deleted, so a mistake can still be undone
+TRASH_RETENTION = float(os.environ.get("TRASH_RETENTION_SECONDS", str(24 * 3600)))
+
+# Startup sweep of folders no character references: "trash" (default), "report" (log only) or "off"
+ORPHAN_SWEEP = os.environ.get("ORPHAN_SWEEP", "trash").lower()
+
+
+# ===============================================
+# 🔹 Deferred deletion of character folders
+# ===============================================
+
+def move_to_trash(folder_path: str):
+    """
+    Move a character folder into the trash area with a single rename (no file I/O).
+    Returns the trash path, or None if the folder doesn't exist (or another worker moved it first).
+    """
+    if not folder_path or not os.path.exists(folder_path):
+        return None
+    os.makedirs(TRASH_DIR, exist_ok=True)
+    trash_path = os.path.join(TRASH_DIR, f"{os.path.basename(os.path.normpath(folder_path))}.{time.time_ns()}")
+    try:
+        os.rename(folder_path, trash_path)
+    except FileNotFoundError:
+        return None
+    _wake_up.set()
+    return trash_path
+
+
+def sweep_orphaned_folders(characters) -> int:
+    """
+    Move folders under UPLOAD_DIR that no character references into the trash
+    (the trash itself and the blob store are skipped). Meant to run once at startup, before any upload can be in progress.
+    Does nothing when the catalog is empty: a missing or unreadable characters.json would make every folder an orphan.
+    With ORPHAN_SWEEP=report the orphans are only logged.
+    """
+    if ORPHAN_SWEEP == "off" or not os.path.isdir(UPLOAD_DIR):
+        return 0
+    if not characters:
+        logger.warning("Catalog is empty, skipping the orphaned folder sweep")
+        return 0
+    known = {os.path.normpath(c["folder"]) for c in characters if c.get("folder")}
+    moved = 0
+    for entry in os.listdir(UPLOAD_DIR):
+        path = os.path.join(UPLOAD_DIR, entry)
+        if entry.startswith(".") or not os.path.isdir(path) or os.path.normpath(path) == os.path.normpath(BLOB_DIR):
+            continue
+        if os.path.normpath(path) not in known:
+            if ORPHAN_SWEEP == "report":
+                logger.warning("Orphaned folder found", extra={"folder": path})
+                continue
+            if move_to_trash(path):
+                moved += 1
+                logger.info("Orphaned folder moved to trash", extra={"folder": path})
+    return moved
+
+
+def _trashed_at(entry: str, path: str) -> float:
+    # Entries are named "<name>.<time_ns>" by move_to_trash
+    suffix = entry.rsplit(".", 1)[-1]
+    if suffix.isdigit():
+        return int(suffix) / 1e9
+    return os.lstat(path).st_ctime
+
+
+def _reap_forever():
+    failed = set()
+    while True:
+        entries = sorted(os.listdir(TRASH_DIR)) if os.path.isdir(TRASH_DIR) else []
+        now = time.time()
+        next_due = None
+        path = None
+        for entry in entries:
+            if entry in failed:
+                continue
+            candidate = os.path.join(TRASH_DIR, entry)
+            try:
+                due = _trashed_at(entry, candidate) + TRASH_RETENTION
+            except FileNotFoundError:
+                continue
+            if due <= now:
+                path = candidate
+                break
+            next_due = due if next_due is None else min(next_due, due)
+        if path is None:
+            # Sleep until the oldest entry expires, or until something new is trashed
+            _wake_up.wait(None if next_due is None else next_due - now)
+            _wake_up.clear()
+            continue
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+            logger.info("Deleted trashed folder", extra={"folder": path})
+        except FileNotFoundError:
+            pass    # Deleted by another worker's reaper
+        except Exception as e:
+            failed.add(os.path.basename(path))
+            logger.warning("Error deleting trashed folder %s: %s", path, e)
+        time.sleep(REAPER_DELAY)
+
+
+_wake_up = threading.Event()
+_reaper = None
+
+
+def start_reaper():
+    """
+    Start the background thread that empties the trash (idempotent).
+    """
+    global _reaper
+    if _reaper is None:
+        _reaper = threading.Thread(target=_reap_forever, name="trash-reaper", daemon=True)
+        _reaper.start()
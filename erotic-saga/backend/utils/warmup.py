@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+
+from utils.analytics import gameplay_stats
+from utils.blob_store import is_blob_path
+from utils.file_manager import load_characters, catalog_stamp, character_image_paths, image_to_base64_to_front_end, image_cache_is_full
+from utils.logger import get_logger
+from utils.question_bank import question_bank
+from utils.question_store import ensure_questions
+from utils.search_index import character_index
+
+logger = get_logger("warmup")
+
+
+# ===============================================
+# 🔹 Startup warm-up (readiness)
+# ===============================================
+
+warmup_status = {
+    "ready": False,
+    "started_at": None,
+    "duration_seconds": None,
+    "characters": 0,
+    "manifests": 0,
+    "questions": 0,
+    "question_bank_seeded": 0,
+    "cover_images": 0,
+}
+
+
+def run_warmup():
+    """
+    Fill the caches the first players would otherwise pay for:
+    catalog, search index, image manifests, questions, question bank, then legacy (base64) cover images of the
+    most played characters until the image cache memory budget is reached.
+    """
+    start = time.time()
+    warmup_status["started_at"] = start
+
+    stamp = catalog_stamp()
+    characters = load_characters()
+    warmup_status["characters"] = len(characters)
+    character_index.rebuild(characters, stamp)
+
+    for char in characters:
+        character_image_paths(char)
+        warmup_status["manifests"] += 1
+        try:
+            ensure_questions(char)
+            warmup_status["questions"] += 1
+        except (FileNotFoundError, KeyError, ValueError):
+            pass
+
+    # First run: seed the question bank from the character quizzes
+    warmup_status["question_bank_seeded"] = question_bank.seed_from_characters(characters)
+
+    plays = gameplay_stats.plays_by_character()
+    for char in sorted(characters, key=lambda c: plays.get(c["id"], 0), reverse=True):
+        img_path = char.get("original_image")
+        # Blob images are served by URL, only legacy folder images are sent as base64
+        if not img_path or is_blob_path(img_path) or not os.path.exists(img_path):
+            continue
+        # base64 is ~4/3 of the file size
+        if image_cache_is_full(os.path.getsize(img_path) * 4 // 3):
+            break
+        image_to_base64_to_front_end(img_path)
+        warmup_status["cover_images"] += 1
+
+    warmup_status["duration_seconds"] = round(time.time() - start, 3)
+    warmup_status["ready"] = True
+    logger.info("Warm-up done", extra={"warmup": dict(warmup_status)})
+
+
+def start_warmup():
+    """
+    Run the warm-up in a background thread so the liveness check answers immediately.
+    """
+    def run():
+        try:
+            run_warmup()
+        except Exception:
+            # Don't keep the worker out of rotation forever because of a warm-up error
+            logger.exception("Warm-up failed")
+            warmup_status["ready"] = True
+
+    threading.Thread(target=run, name="warmup", daemon=True).start()
@@ -0,0 +1,34 @@
+// Write .br and .gz copies of the text assets in dist/ so the backend can serve them precompressed
+import { readdirSync, readFileSync, statSync, writeFileSync } from "node:fs";
+import { join } from "node:path";
+import { fileURLToPath } from "node:url";
+import { brotliCompressSync, gzipSync, constants } from "node:zlib";
+
+// fileURLToPath decodes %20 etc. and gives a native path on Windows (URL.pathname doesn't)
+const DIST_DIR = fileURLToPath(new URL("../dist/", import.meta.url));
+const COMPRESSIBLE = /\.(html|js|mjs|css|json|svg|txt|map|ico|wasm)$/i;
+const MIN_SIZE = 1024;
+
+const walk = (dir) =>
+  readdirSync(dir).flatMap((name) => {
+    const path = join(dir, name);
+    return statSync(path).isDirectory() ? walk(path) : [path];
+  });
+
+let count = 0;
+for (const file of walk(DIST_DIR)) {
+  if (!COMPRESSIBLE.test(file)) continue;
+  const content = readFileSync(file);
+  if (content.length < MIN_SIZE) continue;
+
+  writeFileSync(
+    `${file}.br`,
+    brotliCompressSync(content, {
+      params: { [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY },
+    })
+  );
+  writeFileSync(`${file}.gz`, gzipSync(content, { level: 9 }));
+  count += 1;
+}
+
+console.log(`Precompressed ${count} files in dist/`);
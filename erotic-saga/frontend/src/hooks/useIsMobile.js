@@ -1,15 +1,17 @@
 import { useState, useEffect } from "react";
 
+const detectMobile = () =>
+  /Android|webOS|iPhone|iPad|iPod|BlackBerry|IEMobile|Opera Mini/i.test(
+    navigator.userAgent
+  ) || window.innerWidth <= 768;
+
 export function useIsMobile() {
-  const [isMobile, setIsMobile] = useState(false);
+  // Detect on the first render too, so pages don't run desktop effects on mobile before switching
+  const [isMobile, setIsMobile] = useState(detectMobile);
 
   useEffect(() => {
     const checkMobile = () => {
-      const isMobileDevice =
-        /Android|webOS|iPhone|iPad|iPod|BlackBerry|IEMobile|Opera Mini/i.test(
-          navigator.userAgent
-        ) || window.innerWidth <= 768;
-      setIsMobile(isMobileDevice);
+      setIsMobile(detectMobile());
     };
 
     checkMobile();
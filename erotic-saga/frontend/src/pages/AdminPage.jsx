@@ -815,7 +815,7 @@ export default function AdminPage() {
                 }}
               >
                 <img
-                  src={char.image}
+                  src={char.image_url || char.image}
                   alt={char.name}
                   onClick={() => handleSelectCharacter(char.id)}
                   style={{
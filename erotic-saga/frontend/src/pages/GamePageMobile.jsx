@@ -29,7 +29,7 @@ export default function GamePageMobile() {
 
       const res = await axios.post(`/api/question/${id}`, form);
       setQuestion(res.data.question);
-      setImage(res.data.image);
+      setImage(res.data.image_url || res.data.image);
       setAnswer("");
       setIsWin(false);
     },
@@ -37,10 +37,24 @@ export default function GamePageMobile() {
   );
 
   useEffect(() => {
-    fetchQuestion(1);
-    setHearts(3); // Reset hearts when starting new game
+    // Resume the saved game (question + hearts left) for this character, otherwise start from question 1
+    const startGame = async () => {
+      let startId = 1;
+      let startHearts = 3;
+      try {
+        const res = await axios.get(`/api/progress/${characterId}`);
+        startId = res.data.question_id || 1;
+        startHearts = res.data.hearts || 3;
+      } catch (err) {
+        console.error("Error loading saved progress:", err);
+      }
+      setQid(startId);
+      setHearts(startHearts);
+      fetchQuestion(startId);
+    };
+    startGame();
     setWrongAnswers([]);
-  }, [fetchQuestion]);
+  }, [fetchQuestion, characterId]);
 
   useEffect(() => {
     setAnswer("");
@@ -60,11 +74,11 @@ export default function GamePageMobile() {
       if (res.data.next_question) {
         setQid(res.data.next_question.id);
         setQuestion(res.data.next_question);
-        setImage(res.data.next_image);
+        setImage(res.data.next_image_url || res.data.next_image);
       } else {
         // When the player wins
         setIsWin(true);
-        setImage(res.data.next_image);
+        setImage(res.data.next_image_url || res.data.next_image);
         setQuestion(null);
       }
       setWrongAnswers([]); // Clear wrong answers on correct
@@ -77,7 +91,8 @@ export default function GamePageMobile() {
         }
         return prev;
       });
-      const newHearts = hearts - 1;
+      // The backend keeps the hearts left so a reload can't refill them
+      const newHearts = res.data.hearts ?? hearts - 1;
       setHearts(newHearts);
       setAnswer(""); // Clear selected answer
 
@@ -447,7 +447,7 @@ export default function HomePage() {
                 }}
               >
                 <img
-                  src={char.image}
+                  src={char.image_url || char.image}
                   alt={char.name}
                   style={{
                     width: "100%",
@@ -419,7 +419,7 @@ export default function HomePageMobile() {
                         }}
                       >
                         <img
-                          src={char.image}
+                          src={char.image_url || char.image}
                           alt={char.name}
                           style={{
                             width: "100%",